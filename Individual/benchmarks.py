@@ -0,0 +1,492 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from engine import (
+    ApplicationStore,
+    BitSet,
+    CsvImporter,
+    ApplicationStats,
+    DatabaseStats,
+    EventSummary,
+    JsonSnapshot,
+    OrderIndex,
+    PdfReport,
+    SearchCache,
+    SeatBuckets,
+    SortedColumnIndex,
+    build_view_query,
+    connect_db,
+    init_database,
+    report_summary
+)
+
+
+EVENT_NAMES = [
+    "Python Conference", "Data Science Seminar", "Tkinter Workshop", "AI Lecture", "Pandas Workshop",
+    "IT News Presentation", "SQL Training", "Networking Evening", "Machine Learning Course", "Experts Meeting"
+]
+
+SURNAMES = [
+    "Ivanov", "Petrova", "Sydorov", "Kovalenko", "Melnyk", "Lysenko", "Shevchenko", "Bondarenko",
+    "Tkachenko", "Savchenko", "Kravchenko", "Oliynyk", "Moroz", "Rudenko", "Marchenko", "Boyko"
+]
+
+SEARCH_QUERIES = ["py", "shevchenko", "workshop 12", "conference 123", "ko k.", "nothing like this"]
+
+
+def generate_applications(count, seed=42, distinct=False):
+    rng = random.Random(seed)
+    applications = {}
+    for app_id in range(1, count + 1):
+        initials = "".join(rng.choice("ABDEHIKLMNOPRSTVZ") + "." for _ in range(2))
+        surname = rng.choice(SURNAMES)
+        applications[app_id] = (
+            f"{rng.choice(EVENT_NAMES)} {rng.randrange(1000)}",
+            f"{surname}-{app_id:07d} {initials}" if distinct else f"{surname} {initials}",
+            rng.randint(1, 8)
+        )
+    return applications
+
+
+def scan_search(applications, query):
+    return {app_id for app_id, (event, applicant, seats) in applications.items()
+            if query in event.lower() or query in applicant.lower()}
+
+
+def best_time(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark_search(count, repeat):
+    low = generate_applications(count)
+    high = generate_applications(count, distinct=True)
+    one_match = high[count // 2][1].lower()
+    for title, applications, queries in [
+        ("16 surnames", low, SEARCH_QUERIES),
+        ("distinct applicants", high, ["py", "ko", "shevchenko", one_match[:-2], "nothing like this"]),
+    ]:
+        search_dataset(title, applications, queries, repeat)
+
+
+def search_dataset(title, applications, queries, repeat):
+    count = len(applications)
+
+    def build_index():
+        cache = SearchCache()
+        for app_id, app in applications.items():
+            cache.add(app_id, app)
+        return cache
+
+    def prepare_index():
+        cache = build_index()
+        cache.search("nothing like this")
+        return cache
+
+    start = time.perf_counter()
+    cache = build_index()
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    cache.search("nothing like this")
+    first_seconds = time.perf_counter() - start
+    cache, size = traced_size(prepare_index)
+    print(f"Search benchmark ({title}): {count} applications, index built in {load_seconds:.3f}s, "
+          f"first search {first_seconds * 1000:.1f}ms, {size / 1024 / 1024:.1f} MiB ({size / count:.1f} bytes/row)")
+    print(f"{'query':<24}{'matches':>10}{'scan, ms':>12}{'index, ms':>12}{'speedup':>10}")
+
+    def indexed_search(query):
+        cache.query, cache.matches = "", None
+        return cache.search(query)
+
+    for query in queries:
+        scan_seconds, expected = best_time(lambda: scan_search(applications, query), repeat)
+        index_seconds, found = best_time(lambda: indexed_search(query), repeat)
+        if found != expected:
+            raise AssertionError(f"Index returned different matches for {query!r}")
+        print(f"{query:<24}{len(found):>10}{scan_seconds * 1000:>12.2f}{index_seconds * 1000:>12.2f}"
+              f"{scan_seconds / index_seconds:>9.1f}x")
+
+
+def create_database(db_file, applications):
+    with sqlite3.connect(db_file) as conn:
+        conn.execute("""
+            CREATE TABLE applications (
+                id INTEGER PRIMARY KEY,
+                event TEXT,
+                applicant TEXT,
+                seats INTEGER,
+                position INTEGER
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO applications (id, event, applicant, seats, position) VALUES (?, ?, ?, ?, ?)",
+            [(app_id, *app, app_id * OrderIndex.GAP) for app_id, app in applications.items()]
+        )
+        conn.commit()
+
+
+def benchmark_pdf_report(count):
+    with tempfile.TemporaryDirectory() as directory:
+        db_file = os.path.join(directory, "applications.sqlite")
+        pdf_file = os.path.join(directory, "report.pdf")
+        create_database(db_file, generate_applications(count))
+
+        for title, view in [("full report", {}), ("seats 5+ by event", {"seat_filter": "5+", "sort_column": "event"})]:
+            query, params = build_view_query("event, applicant, seats", **view)
+            report = PdfReport(db_file, pdf_file, query, params, [f"Total applications: {count}"], ())
+            start = time.perf_counter()
+            kind, rows = report.work()
+            elapsed = time.perf_counter() - start
+            pages = 0
+            while not report.events.empty():
+                event_kind, (fraction, text) = report.events.get()
+                pages = text
+            print(f"PDF benchmark ({title}): {rows} rows in {elapsed:.2f}s, "
+                  f"{os.path.getsize(pdf_file) / 1024 / 1024:.1f} MiB, last progress: {pages}")
+
+
+def traced_size(build):
+    tracemalloc.start()
+    try:
+        result = build()
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def load_rows(db_file, container):
+    with sqlite3.connect(db_file) as conn:
+        for app_id, event, applicant, seats in conn.execute("SELECT id, event, applicant, seats FROM applications"):
+            container[app_id] = (event, applicant, seats)
+    return container
+
+
+def load_index(db_file, index):
+    with sqlite3.connect(db_file) as conn:
+        for app_id, event, applicant, seats in conn.execute(
+                "SELECT id, event, applicant, seats FROM applications ORDER BY position, id"):
+            index.add(app_id, (event, applicant, seats))
+    return index
+
+
+def load_order(db_file):
+    order = OrderIndex()
+    with sqlite3.connect(db_file) as conn:
+        for app_id, position in conn.execute("SELECT id, position FROM applications ORDER BY position, id"):
+            order.append(app_id, position)
+    return order
+
+
+def highlight_every(container, app_ids, step=10):
+    for app_id in app_ids[::step]:
+        container.add(app_id)
+    return container
+
+
+def benchmark_memory(count):
+    with tempfile.TemporaryDirectory() as directory:
+        db_file = os.path.join(directory, "applications.sqlite")
+        create_database(db_file, generate_applications(count))
+
+        print(f"Memory benchmark: {count} applications, 1 in 10 highlighted")
+        print(f"{'representation':<28}{'MiB':>10}{'bytes/row':>12}")
+        app_ids = list(range(1, count + 1))
+        for title, build in [
+            ("dict of tuples", lambda: load_rows(db_file, {})),
+            ("ApplicationStore", lambda: load_rows(db_file, ApplicationStore())),
+            ("highlight set", lambda: highlight_every(set(), app_ids)),
+            ("highlight BitSet", lambda: highlight_every(BitSet(), app_ids)),
+        ]:
+            result, size = traced_size(build)
+            print(f"{title:<28}{size / 1024 / 1024:>10.1f}{size / count:>12.1f}")
+            del result
+
+        store = load_rows(db_file, ApplicationStore())
+        total = 0
+        for title, build in [
+            ("SearchCache", lambda: load_index(db_file, SearchCache())),
+            ("SortedColumnIndex event", lambda: load_index(db_file, SortedColumnIndex(0))),
+            ("SortedColumnIndex applicant", lambda: load_index(db_file, SortedColumnIndex(1))),
+            ("SortedColumnIndex seats", lambda: load_index(db_file, SortedColumnIndex(2))),
+            ("OrderIndex", lambda: load_order(db_file)),
+            ("SeatBuckets", lambda: load_index(db_file, SeatBuckets())),
+            ("ApplicationStats", lambda: load_index(db_file, ApplicationStats())),
+            ("EventSummary", lambda: load_index(db_file, EventSummary(store))),
+        ]:
+            result, size = traced_size(build)
+            total += size
+            print(f"{title:<28}{size / 1024 / 1024:>10.1f}{size / count:>12.1f}")
+            del result
+        print(f"{'all record indexes':<28}{total / 1024 / 1024:>10.1f}{total / count:>12.1f}")
+
+
+def measure(func, repeat, trace_memory):
+    best, result = best_time(func, repeat)
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            func()
+            size, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return best, peak, result
+
+
+def write_csv(file_path, applications):
+    with open(file_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Event name", "Applicant", "Seats number"])
+        writer.writerows(applications.values())
+
+
+class StubVariable:
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class StubWidget:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class StubRoot(StubWidget):
+    # Scheduled callbacks are dropped: the cases call what they measure directly
+    def after(self, delay, func=None, *args):
+        return None
+
+    def after_idle(self, func, *args):
+        return None
+
+
+class StubTreeview(StubWidget):
+    # Keeps the rows and selection the way ttk.Treeview does, so rendering does the same work without a display
+    def __init__(self):
+        self.children = []
+        self.values = {}
+        self.selected = []
+
+    def get_children(self, item=""):
+        return tuple(self.children)
+
+    def insert(self, parent, index, iid=None, values=(), tags=()):
+        self.children.insert(index, iid)
+        self.values[iid] = values
+        return iid
+
+    def delete(self, *items):
+        removed = set(items)
+        self.children = [item for item in self.children if item not in removed]
+        for item in items:
+            self.values.pop(item, None)
+        self.selected = [item for item in self.selected if item not in removed]
+
+    def index(self, item):
+        return self.children.index(item)
+
+    def move(self, item, parent, index):
+        self.children.remove(item)
+        self.children.insert(index, item)
+
+    def item(self, item, option=None, **kwargs):
+        if "values" in kwargs:
+            self.values[item] = kwargs["values"]
+        return self.values[item] if option == "values" else None
+
+    def selection(self):
+        return tuple(self.selected)
+
+    def selection_set(self, *items):
+        self.selected = [item for group in items for item in ([group] if isinstance(group, str) else group)]
+
+    def selection_add(self, *items):
+        self.selected.extend(items)
+
+
+def headless_manager():
+    # The manager with every widget stubbed out, for machines where Tk cannot open a display
+    from main import ApplicationManager
+
+    class HeadlessManager(ApplicationManager):
+        def setup_ui(self):
+            self.treeview = StubTreeview()
+            self.scrollbar = StubWidget()
+            self.search_var = StubVariable()
+            self.filter_var = StubVariable("All")
+            self.stats_vars = {name: StubVariable() for name in
+                               ["total_apps", "total_seats", "unique_apps", "avg_seats", "seat_buckets", "loading"]}
+            self.refresh_display()
+
+    return HeadlessManager(StubRoot())
+
+
+def open_manager():
+    import tkinter as tk
+    os.environ.update(LAZY_LOAD="0", JSON_SNAPSHOT="0", SQL_VIEW="0")
+    os.environ.setdefault("SMTP_EMAIL", "benchmark@localhost")
+    os.environ.setdefault("SMTP_PASSWORD", "benchmark")
+    from main import ApplicationManager
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return headless_manager(), f"Tk is not available ({e}), UI cases render into a stub Treeview"
+    root.withdraw()
+    return ApplicationManager(root), None
+
+
+def engine_cases(directory, db_file):
+    csv_file = os.path.join(directory, "applications.csv")
+    json_file = os.path.join(directory, "applications.json")
+    pdf_file = os.path.join(directory, "applications_report.pdf")
+    conn = connect_db(db_file)
+    stats = DatabaseStats()
+    stats.refresh(conn)
+    full_query = build_view_query("event, applicant, seats")
+    return conn, [
+        ("csv_import", lambda: CsvImporter(db_file, csv_file, "skip").work()),
+        ("json_snapshot", lambda: JsonSnapshot(db_file, json_file).work()),
+        ("pdf_report", lambda: PdfReport(db_file, pdf_file, *full_query, report_summary(stats), ()).work()),
+        ("database_stats", lambda: stats.refresh(conn)),
+        ("search_query", lambda: conn.execute(*build_view_query("id", "shevchenko", fts=True)).fetchall()),
+    ]
+
+
+def ui_cases(manager):
+    def search(text):
+        manager.search_cache.query, manager.search_cache.matches = "", None
+        manager.current_search = text
+        manager.refresh_display()
+
+    def sort(column):
+        manager.sort_column = column
+        manager.refresh_display()
+
+    def reset():
+        manager.current_search = ""
+        manager.sort_column = None
+        manager.refresh_display()
+
+    return [
+        ("refresh_display", manager.refresh_display),
+        ("refresh_display_search", lambda: search("shevchenko")),
+        ("refresh_display_sort", lambda: sort("applicant")),
+        ("refresh_display_reset", reset),
+        ("update_statistics", manager.update_statistics),
+        ("db_save_all", manager.db_save_all),
+    ]
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_suite(sizes, repeat, output, baseline=None, trace_memory=True):
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "results": []
+    }
+    previous = {}
+    if baseline:
+        with open(baseline, encoding="utf-8") as file:
+            previous = {(entry["case"], entry["rows"]): entry for entry in json.load(file)["results"]}
+
+    print(f"{'case':<26}{'rows':>10}{'seconds':>12}{'peak MiB':>10}{'vs baseline':>13}")
+    working_directory = os.getcwd()
+    for count in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            db_file = os.path.join(directory, "applications.sqlite")
+            applications = generate_applications(count)
+            create_database(db_file, applications)
+            write_csv(os.path.join(directory, "applications.csv"), applications)
+            del applications
+
+            with connect_db(db_file) as conn:
+                init_database(conn)
+            conn, cases = engine_cases(directory, db_file)
+            os.chdir(directory)
+            try:
+                start = time.perf_counter()
+                manager, note = open_manager()
+                startup = time.perf_counter() - start
+                results["results"].append({"case": "startup", "rows": count, "seconds": startup,
+                                           "peak_bytes": None})
+                cases += ui_cases(manager)
+                if note and count == sizes[0]:
+                    print(note)
+
+                for case, func in cases:
+                    seconds, peak, result = measure(func, repeat, trace_memory)
+                    results["results"].append({"case": case, "rows": count, "seconds": seconds,
+                                               "peak_bytes": peak})
+
+                manager.on_closing()
+            finally:
+                conn.close()
+                os.chdir(working_directory)
+
+        for entry in results["results"]:
+            if entry["rows"] != count:
+                continue
+            peak = f"{entry['peak_bytes'] / 1024 / 1024:.1f}" if entry["peak_bytes"] is not None else "-"
+            old = previous.get((entry["case"], count))
+            ratio = f"{entry['seconds'] / old['seconds']:.2f}x" if old and old["seconds"] else "-"
+            print(f"{entry['case']:<26}{count:>10}{entry['seconds']:>12.4f}{peak:>10}{ratio:>13}")
+
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Application manager benchmarks")
+    parser.add_argument("benchmarks", nargs="*", choices=["search", "pdf", "memory", "suite"],
+                        default=["search", "pdf", "memory"])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000],
+                        help="dataset sizes for the suite")
+    parser.add_argument("--output", default="benchmark_results.json", help="suite results file")
+    parser.add_argument("--baseline", help="earlier suite results file to compare against")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak memory pass")
+    args = parser.parse_args()
+
+    if "search" in args.benchmarks:
+        benchmark_search(args.rows, args.repeat)
+    if "pdf" in args.benchmarks:
+        benchmark_pdf_report(args.rows)
+    if "memory" in args.benchmarks:
+        benchmark_memory(args.rows)
+    if "suite" in args.benchmarks:
+        benchmark_suite(args.sizes, args.repeat, args.output, args.baseline, not args.no_memory)
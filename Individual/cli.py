@@ -0,0 +1,167 @@
+import argparse
+import sys
+
+from engine import (
+    CsvExporter,
+    CsvImporter,
+    DatabaseStats,
+    DedupeJob,
+    DEDUPE_POLICIES,
+    PdfReport,
+    build_view_query,
+    connect_db,
+    init_database,
+    report_summary,
+    sort_event_rows
+)
+
+
+def run_job(job):
+    job.start()
+    while True:
+        try:
+            kind, data = job.events.get()
+        except KeyboardInterrupt:
+            job.cancel()
+            continue
+
+        if kind == "progress":
+            fraction, text = data
+            print(f"\r{fraction * 100:5.1f}%  {text:<60}", end="", file=sys.stderr, flush=True)
+            continue
+
+        print(file=sys.stderr)
+        return kind, data
+
+
+def view_query(args, fts):
+    return build_view_query("event, applicant, seats", args.search.lower(), args.seats,
+                            args.sort, args.desc, fts)
+
+
+def load_stats(conn):
+    stats = DatabaseStats()
+    stats.refresh(conn)
+    return stats
+
+
+def import_command(args, conn, fts):
+    kind, data = run_job(CsvImporter(args.db, args.file, None if args.dedupe == "off" else args.dedupe))
+    if kind == "done":
+        print(f"Data imported successfully: {data[0]} applications, {data[1]} rows rejected, {data[2]} duplicates")
+    elif kind == "empty":
+        print("No valid data found in the CSV file")
+    elif kind == "cancelled":
+        print("Import cancelled, existing data was kept")
+    else:
+        print(f"Failed to import data: {data}", file=sys.stderr)
+    return 0 if kind == "done" else 1
+
+
+def dedupe_command(args, conn, fts):
+    kind, data = run_job(DedupeJob(args.db, args.policy))
+    if kind == "done":
+        print(f"Duplicates removed: {data}")
+    elif kind == "cancelled":
+        print("Duplicate removal cancelled, existing data was kept")
+    else:
+        print(f"Failed to remove duplicates: {data}", file=sys.stderr)
+    return 0 if kind == "done" else 1
+
+
+def export_csv_command(args, conn, fts):
+    query, params = view_query(args, fts)
+    kind, data = run_job(CsvExporter(args.db, args.file, query, params))
+    if kind == "done":
+        print(f"Data exported successfully: {data} applications")
+    elif kind == "cancelled":
+        print("Export cancelled")
+    else:
+        print(f"Failed to export data: {data}", file=sys.stderr)
+    return 0 if kind == "done" else 1
+
+
+def export_pdf_command(args, conn, fts):
+    query, params = view_query(args, fts)
+    stats = load_stats(conn)
+    summary = report_summary(stats)
+    if args.search or args.seats != "All":
+        count = conn.execute(f"SELECT COUNT(*) FROM ({query})", params).fetchone()[0]
+        summary.append(f"Applications in this report: {count}")
+
+    kind, data = run_job(PdfReport(args.db, args.file, query, params, summary, sort_event_rows(stats.rows())))
+    if kind == "done":
+        print(f"PDF report generated successfully: {data} applications")
+    elif kind == "cancelled":
+        print("PDF report cancelled")
+    else:
+        print(f"Failed to generate PDF: {data}", file=sys.stderr)
+    return 0 if kind == "done" else 1
+
+
+def stats_command(args, conn, fts):
+    stats = load_stats(conn)
+    for line in report_summary(stats):
+        print(line)
+    print(f"Average seats per application: {stats.average_seats():.1f}")
+
+    bucket_counts = stats.counts()
+    print("Seats distribution: " + "   ".join(
+        f"{option}: {bucket_counts.get(option, 0)}" for option in ["1", "2", "3", "4", "5+"]
+    ))
+
+    if args.events:
+        print(f"{'Event':<50}{'Applications':>14}{'Seats':>10}")
+        for event, applications, seats in sort_event_rows(stats.rows())[:args.events]:
+            print(f"{event[:49]:<50}{applications:>14}{seats:>10}")
+    return 0
+
+
+def add_view_arguments(parser):
+    parser.add_argument("--search", default="", help="only applications whose event or applicant contains this text")
+    parser.add_argument("--seats", default="All", choices=["All", "1", "2", "3", "4", "5+"])
+    parser.add_argument("--sort", choices=["event", "applicant", "seats"])
+    parser.add_argument("--desc", action="store_true", help="sort in descending order")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Application manager batch commands")
+    parser.add_argument("--db", default="applications.sqlite", help="SQLite database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="replace all applications with the rows of a CSV file")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--dedupe", default="skip", choices=DEDUPE_POLICIES + ["off"],
+                               help="how to handle rows with the same event and applicant")
+    import_parser.set_defaults(handler=import_command)
+
+    dedupe_parser = commands.add_parser("dedupe", help="remove duplicate applications from the database")
+    dedupe_parser.add_argument("--policy", default="skip", choices=DEDUPE_POLICIES,
+                               help="skip keeps the first row, merge adds up seats, replace takes the last values")
+    dedupe_parser.set_defaults(handler=dedupe_command)
+
+    csv_parser = commands.add_parser("export-csv", help="export applications to a CSV file")
+    csv_parser.add_argument("file")
+    add_view_arguments(csv_parser)
+    csv_parser.set_defaults(handler=export_csv_command)
+
+    pdf_parser = commands.add_parser("export-pdf", help="generate a PDF report")
+    pdf_parser.add_argument("file")
+    add_view_arguments(pdf_parser)
+    pdf_parser.set_defaults(handler=export_pdf_command)
+
+    stats_parser = commands.add_parser("stats", help="print summary statistics")
+    stats_parser.add_argument("--events", type=int, default=10, help="number of events to list, 0 for none")
+    stats_parser.set_defaults(handler=stats_command)
+
+    args = parser.parse_args(argv)
+    conn = connect_db(args.db)
+    try:
+        fts = init_database(conn)
+        return args.handler(args, conn, fts)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
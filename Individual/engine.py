@@ -0,0 +1,1617 @@
+import sqlite3
+import csv
+import bisect
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from array import array
+from collections.abc import MutableMapping
+from datetime import datetime
+from fpdf import FPDF
+import smtplib
+from email.message import EmailMessage
+
+
+class OrderIndex:
+    GAP = 1 << 16
+    MISSING = -1 << 63
+
+    def __init__(self):
+        self.ranks = array("q")
+        self.rank_column = array("q")
+        self.id_column = array("i")
+
+    def __iter__(self):
+        return iter(self.id_column)
+
+    def __len__(self):
+        return len(self.id_column)
+
+    def __contains__(self, app_id):
+        return 0 <= app_id < len(self.ranks) and self.ranks[app_id] != self.MISSING
+
+    def rank(self, app_id):
+        if app_id not in self:
+            raise KeyError(app_id)
+        return self.ranks[app_id]
+
+    def index(self, app_id):
+        return self.position(self.rank(app_id), app_id)
+
+    def position(self, rank, app_id):
+        index = bisect.bisect_left(self.rank_column, rank)
+        while index < len(self.id_column) and self.rank_column[index] == rank and self.id_column[index] < app_id:
+            index += 1
+        return index
+
+    def at(self, index):
+        return self.id_column[index]
+
+    def set_rank(self, app_id, rank):
+        if app_id >= len(self.ranks):
+            grow = max(app_id + 1, 2 * len(self.ranks)) - len(self.ranks)
+            self.ranks.extend(array("q", [self.MISSING]) * grow)
+        self.ranks[app_id] = rank
+
+    def append(self, app_id, rank=None):
+        if rank is None:
+            rank = self.rank_column[-1] + self.GAP if self.rank_column else self.GAP
+        if self.rank_column and rank <= self.rank_column[-1]:
+            index = self.position(rank, app_id)
+            self.rank_column.insert(index, rank)
+            self.id_column.insert(index, app_id)
+        else:
+            self.rank_column.append(rank)
+            self.id_column.append(app_id)
+        self.set_rank(app_id, rank)
+        return rank
+
+    def remove(self, app_id):
+        index = self.index(app_id)
+        del self.rank_column[index]
+        del self.id_column[index]
+        self.ranks[app_id] = self.MISSING
+
+    def move(self, app_id, new_index):
+        old_index = self.index(app_id)
+        if old_index == new_index:
+            return {}
+        del self.rank_column[old_index]
+        del self.id_column[old_index]
+
+        before = self.rank_column[new_index - 1] if new_index > 0 else None
+        after = self.rank_column[new_index] if new_index < len(self.rank_column) else None
+        if before is None and after is None:
+            rank = self.GAP
+        elif before is None:
+            rank = after - self.GAP
+        elif after is None:
+            rank = before + self.GAP
+        elif after - before > 1:
+            rank = (before + after) // 2
+        else:
+            self.rank_column.insert(new_index, before)
+            self.id_column.insert(new_index, app_id)
+            return self.rebalance()
+
+        self.rank_column.insert(new_index, rank)
+        self.id_column.insert(new_index, app_id)
+        self.ranks[app_id] = rank
+        return {app_id: rank}
+
+    def place(self, app_ids, index):
+        before = self.rank_column[index - 1] if index > 0 else None
+        after = self.rank_column[index] if index < len(self.rank_column) else None
+        ranks = self.spread(before, after, len(app_ids))
+        if ranks is None:
+            self.rank_column[index:index] = array("q", [before] * len(app_ids))
+            self.id_column[index:index] = array("i", app_ids)
+            for app_id in app_ids:
+                self.set_rank(app_id, before)
+            return self.rebalance()
+
+        self.rank_column[index:index] = array("q", ranks)
+        self.id_column[index:index] = array("i", app_ids)
+        for app_id, rank in zip(app_ids, ranks):
+            self.set_rank(app_id, rank)
+        return dict(zip(app_ids, ranks))
+
+    @classmethod
+    def spread(cls, before, after, count):
+        if before is None and after is None:
+            return range(cls.GAP, (count + 1) * cls.GAP, cls.GAP)
+        if before is None:
+            return range(after - count * cls.GAP, after, cls.GAP)
+        if after is None:
+            return range(before + cls.GAP, before + (count + 1) * cls.GAP, cls.GAP)
+        step = (after - before) // (count + 1)
+        if step < 1:
+            return None
+        return range(before + step, before + (count + 1) * step, step)
+
+    def rebalance(self):
+        self.rank_column = array("q", range(self.GAP, (len(self.id_column) + 1) * self.GAP, self.GAP))
+        for app_id, rank in zip(self.id_column, self.rank_column):
+            self.ranks[app_id] = rank
+        return dict(zip(self.id_column, self.rank_column))
+
+    def scale(self, factor):
+        self.rank_column = array("q", (rank * factor for rank in self.rank_column))
+        for app_id, rank in zip(self.id_column, self.rank_column):
+            self.ranks[app_id] = rank
+
+
+def longest_increasing_run(items, positions):
+    tails = []
+    tail_items = []
+    parents = {}
+    for item in items:
+        position = positions[item]
+        slot = bisect.bisect_left(tails, position)
+        parents[item] = tail_items[slot - 1] if slot else None
+        if slot == len(tails):
+            tails.append(position)
+            tail_items.append(item)
+        else:
+            tails[slot] = position
+            tail_items[slot] = item
+
+    result = set()
+    item = tail_items[-1] if tail_items else None
+    while item is not None:
+        result.add(item)
+        item = parents[item]
+    return result
+
+
+class StringPool:
+    def __init__(self):
+        self.strings = []
+        self.codes = {}
+
+    def encode(self, text):
+        code = self.codes.get(text)
+        if code is None:
+            code = self.codes[text] = len(self.strings)
+            self.strings.append(text)
+        return code
+
+
+class BitSet:
+    def __init__(self):
+        self.bits = bytearray()
+        self.count = 0
+
+    def __contains__(self, index):
+        byte = index >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << (index & 7)))
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for byte_index, byte in enumerate(self.bits):
+            if byte:
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield byte_index * 8 + bit
+
+    def add(self, index):
+        byte = index >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(max(byte + 1, 2 * len(self.bits)) - len(self.bits)))
+        if not self.bits[byte] & (1 << (index & 7)):
+            self.bits[byte] |= 1 << (index & 7)
+            self.count += 1
+
+    def discard(self, index):
+        if index in self:
+            self.bits[index >> 3] &= ~(1 << (index & 7))
+            self.count -= 1
+
+    def remove(self, index):
+        if index not in self:
+            raise KeyError(index)
+        self.discard(index)
+
+    def clear(self):
+        self.bits = bytearray()
+        self.count = 0
+
+
+class ApplicationStore(MutableMapping):
+    MISSING = -1
+    MAX_SEATS = (1 << 63) - 1
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.events = StringPool()
+        self.applicants = StringPool()
+        self.event_codes = array("i")
+        self.applicant_codes = array("i")
+        self.seats = array("q")
+        self.versions = array("i")
+        self.count = 0
+
+    def __contains__(self, app_id):
+        return 0 <= app_id < len(self.event_codes) and self.event_codes[app_id] != self.MISSING
+
+    def __getitem__(self, app_id):
+        if app_id not in self:
+            raise KeyError(app_id)
+        return (self.events.strings[self.event_codes[app_id]],
+                self.applicants.strings[self.applicant_codes[app_id]],
+                self.seats[app_id])
+
+    def __setitem__(self, app_id, app):
+        if app_id >= len(self.event_codes):
+            grow = max(app_id + 1, 2 * len(self.event_codes)) - len(self.event_codes)
+            for column in (self.event_codes, self.applicant_codes, self.seats):
+                column.extend(array(column.typecode, [self.MISSING]) * grow)
+            self.versions.extend(array("i", [0]) * grow)
+        if self.event_codes[app_id] == self.MISSING:
+            self.count += 1
+
+        event, applicant, seats = app
+        self.event_codes[app_id] = self.events.encode(event)
+        self.applicant_codes[app_id] = self.applicants.encode(applicant)
+        self.seats[app_id] = seats
+
+    def __delitem__(self, app_id):
+        if app_id not in self:
+            raise KeyError(app_id)
+        self.event_codes[app_id] = self.MISSING
+        self.applicant_codes[app_id] = self.MISSING
+        self.count -= 1
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return (app_id for app_id, code in enumerate(self.event_codes) if code != self.MISSING)
+
+    def version(self, app_id):
+        return self.versions[app_id] if app_id < len(self.versions) else 0
+
+    def set_version(self, app_id, version):
+        self.versions[app_id] = version
+
+
+class SubstringIndex:
+    MISSING = -1
+    SEPARATOR = "\0"
+
+    def __init__(self, pool, codes):
+        self.pool = pool
+        self.codes = codes
+        self.text = ""
+        self.starts = array("q")
+        self.heads = array("i")
+        self.next_rows = array("i")
+        self.prev_rows = array("i")
+
+    def add(self, app_id):
+        code = self.codes[app_id]
+        if code >= len(self.heads):
+            self.heads.extend(array("i", [self.MISSING]) * (max(code + 1, 2 * len(self.heads)) - len(self.heads)))
+        if app_id >= len(self.next_rows):
+            grow = max(app_id + 1, 2 * len(self.next_rows)) - len(self.next_rows)
+            self.next_rows.extend(array("i", [self.MISSING]) * grow)
+            self.prev_rows.extend(array("i", [self.MISSING]) * grow)
+
+        head = self.heads[code]
+        self.next_rows[app_id] = head
+        self.prev_rows[app_id] = self.MISSING
+        if head != self.MISSING:
+            self.prev_rows[head] = app_id
+        self.heads[code] = app_id
+
+    def remove(self, app_id):
+        prev_row, next_row = self.prev_rows[app_id], self.next_rows[app_id]
+        if prev_row == self.MISSING:
+            self.heads[self.codes[app_id]] = next_row
+        else:
+            self.next_rows[prev_row] = next_row
+        if next_row != self.MISSING:
+            self.prev_rows[next_row] = prev_row
+
+    def refresh_text(self):
+        strings = self.pool.strings
+        if len(self.starts) < len(strings):
+            new_strings = strings[len(self.starts):]
+            offset = len(self.text)
+            for text in new_strings:
+                self.starts.append(offset)
+                offset += len(text) + 1
+            self.text += self.SEPARATOR.join(new_strings) + self.SEPARATOR
+
+    def count(self, query):
+        self.refresh_text()
+        return self.text.count(query)
+
+    def matching_codes(self, query):
+        self.refresh_text()
+        if self.SEPARATOR in query:
+            return set()
+
+        codes = set()
+        find, starts = self.text.find, self.starts
+        index = find(query)
+        while index >= 0:
+            code = bisect.bisect_right(starts, index) - 1
+            codes.add(code)
+            if code + 1 == len(starts):
+                break
+            index = find(query, starts[code + 1])
+        return codes
+
+    def rows_for(self, codes):
+        rows = []
+        heads, next_rows = self.heads, self.next_rows
+        for code in codes:
+            row = heads[code] if code < len(heads) else self.MISSING
+            while row != self.MISSING:
+                rows.append(row)
+                row = next_rows[row]
+        return rows
+
+    def flags(self, query):
+        flags = bytearray(query in text for text in self.pool.strings)
+        flags.append(0)
+        return flags
+
+
+class SortedColumnIndex:
+    def __init__(self, column):
+        self.column = column
+        self.pool = None if column == 2 else StringPool()
+        self.codes = array("q" if self.pool is None else "i")
+        self.entries = array("i")
+        self.is_sorted = False
+
+    def value(self, app_id):
+        code = self.codes[app_id]
+        return code if self.pool is None else self.pool.strings[code]
+
+    def key(self, app_id):
+        return self.value(app_id), app_id
+
+    def add(self, app_id, app):
+        value = app[self.column]
+        if app_id >= len(self.codes):
+            self.codes.extend(array(self.codes.typecode, [0]) * (max(app_id + 1, 2 * len(self.codes)) - len(self.codes)))
+        self.codes[app_id] = value if self.pool is None else self.pool.encode(value)
+        if not self.is_sorted or not self.entries or (value, app_id) > self.key(self.entries[-1]):
+            self.entries.append(app_id)
+        else:
+            bisect.insort(self.entries, app_id, key=self.key)
+
+    def remove(self, app_id, app):
+        self.ensure_sorted()
+        del self.entries[bisect.bisect_left(self.entries, (app[self.column], app_id), key=self.key)]
+
+    def clear(self):
+        self.pool = None if self.column == 2 else StringPool()
+        self.codes = array("q" if self.pool is None else "i")
+        self.entries = array("i")
+        self.is_sorted = False
+
+    def ensure_sorted(self):
+        if not self.is_sorted:
+            self.entries = array("i", sorted(self.entries, key=self.key))
+            self.is_sorted = True
+
+    def ids(self, reverse=False):
+        self.ensure_sorted()
+        return reversed(self.entries) if reverse else iter(self.entries)
+
+
+class SeatBuckets:
+    OPEN_BUCKET = 5
+
+    def __init__(self):
+        self.buckets = {}
+
+    @classmethod
+    def bucket(cls, seats):
+        return f"{cls.OPEN_BUCKET}+" if seats >= cls.OPEN_BUCKET else str(seats)
+
+    def add(self, app_id, app):
+        self.buckets.setdefault(self.bucket(app[2]), set()).add(app_id)
+
+    def remove(self, app_id, app):
+        key = self.bucket(app[2])
+        bucket = self.buckets[key]
+        bucket.discard(app_id)
+        if not bucket:
+            del self.buckets[key]
+
+    def clear(self):
+        self.buckets = {}
+
+    def ids_for(self, seat_filter):
+        if seat_filter == "All":
+            return None
+        return self.buckets.get(seat_filter, set())
+
+    def counts(self):
+        return {key: len(ids) for key, ids in self.buckets.items()}
+
+
+class ApplicationStats:
+    def __init__(self):
+        self.count = 0
+        self.total_seats = 0
+        self.applicants = {}
+
+    def add(self, app_id, app):
+        self.count += 1
+        self.total_seats += app[2]
+        self.applicants[app[1]] = self.applicants.get(app[1], 0) + 1
+
+    def remove(self, app_id, app):
+        self.count -= 1
+        self.total_seats -= app[2]
+        if self.applicants[app[1]] == 1:
+            del self.applicants[app[1]]
+        else:
+            self.applicants[app[1]] -= 1
+
+    def clear(self):
+        self.count = 0
+        self.total_seats = 0
+        self.applicants = {}
+
+    def unique_applicants(self):
+        return len(self.applicants)
+
+    def average_seats(self):
+        return self.total_seats / self.count if self.count > 0 else 0
+
+
+class EventSummary:
+    def __init__(self, store):
+        self.store = store
+        self.applications = array("i")
+        self.seats = []
+        self.version = 0
+
+    def add(self, app_id, app):
+        event_id = self.store.events.encode(app[0])
+        if event_id >= len(self.applications):
+            grow = len(self.store.events.strings) - len(self.applications)
+            self.applications.extend(array("i", [0]) * grow)
+            self.seats.extend([0] * grow)
+        self.applications[event_id] += 1
+        self.seats[event_id] += app[2]
+        self.version += 1
+
+    def remove(self, app_id, app):
+        event_id = self.store.events.codes[app[0]]
+        self.applications[event_id] -= 1
+        self.seats[event_id] -= app[2]
+        self.version += 1
+
+    def clear(self):
+        self.applications = array("i")
+        self.seats = []
+        self.version += 1
+
+    def rows(self):
+        return [(event, applications, seats)
+                for event, applications, seats in zip(self.store.events.strings, self.applications, self.seats)
+                if applications]
+
+
+class DatabaseStats:
+    def __init__(self):
+        self.count = 0
+        self.total_seats = 0
+        self.applicants = 0
+        self.buckets = {}
+        self.events = {}
+        self.version = 0
+
+    def refresh(self, conn):
+        self.count, total_seats, self.applicants = conn.execute(
+            "SELECT COUNT(*), SUM(seats), COUNT(DISTINCT applicant) FROM applications"
+        ).fetchone()
+        self.total_seats = total_seats or 0
+
+        self.buckets = {}
+        for seats, count in conn.execute("SELECT seats, COUNT(*) FROM applications GROUP BY seats"):
+            key = SeatBuckets.bucket(seats)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+        self.events = {event: [count, seats] for event, count, seats in conn.execute(
+            "SELECT event, COUNT(*), SUM(seats) FROM applications GROUP BY event"
+        )}
+        self.version += 1
+
+    def read(self, conn, app_ids):
+        rows = {}
+        app_ids = list(app_ids)
+        for start in range(0, len(app_ids), 500):
+            chunk = app_ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            rows.update((app_id, (event, applicant, seats)) for app_id, event, applicant, seats in conn.execute(
+                f"SELECT id, event, applicant, seats FROM applications WHERE id IN ({placeholders})", chunk))
+        return rows
+
+    def changes(self, conn, old_rows, new_rows):
+        # Called inside the writing transaction: the per-name counts already include the new rows
+        names = list({app[1] for app in old_rows.values()} | {app[1] for app in new_rows.values()})
+        after = {}
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            after.update(conn.execute(
+                f"SELECT applicant, COUNT(*) FROM applications WHERE applicant IN ({placeholders}) "
+                f"GROUP BY applicant", chunk))
+        before = dict(after)
+        for app in new_rows.values():
+            before[app[1]] -= 1
+        for app in old_rows.values():
+            before[app[1]] = before.get(app[1], 0) + 1
+        applicants = sum(1 for name in names if after.get(name)) - sum(1 for name in names if before.get(name))
+        return list(old_rows.values()), list(new_rows.values()), applicants
+
+    def apply(self, changes):
+        removed, added, applicants = changes
+        for sign, rows in ((-1, removed), (1, added)):
+            for event, applicant, seats in rows:
+                self.count += sign
+                self.total_seats += sign * seats
+                key = SeatBuckets.bucket(seats)
+                self.buckets[key] = self.buckets.get(key, 0) + sign
+                totals = self.events.setdefault(event, [0, 0])
+                totals[0] += sign
+                totals[1] += sign * seats
+                if not totals[0]:
+                    del self.events[event]
+        self.applicants += applicants
+        self.version += 1
+
+    def unique_applicants(self):
+        return self.applicants
+
+    def average_seats(self):
+        return self.total_seats / self.count if self.count > 0 else 0
+
+    def counts(self):
+        return self.buckets
+
+    def rows(self):
+        return [(event, count, seats) for event, (count, seats) in self.events.items()]
+
+
+class SearchCache:
+    SCAN_RATIO = 16
+
+    def __init__(self):
+        self.clear()
+
+    def add(self, app_id, app):
+        key = (app[0].lower(), app[1].lower(), 0)
+        self.keys[app_id] = key
+        self.events.add(app_id)
+        self.applicants.add(app_id)
+        if self.matches is not None and self.key_matches(key, self.query):
+            self.matches.add(app_id)
+
+    def remove(self, app_id, app):
+        self.events.remove(app_id)
+        self.applicants.remove(app_id)
+        del self.keys[app_id]
+        if self.matches is not None:
+            self.matches.discard(app_id)
+
+    def clear(self):
+        self.keys = ApplicationStore()
+        self.events = SubstringIndex(self.keys.events, self.keys.event_codes)
+        self.applicants = SubstringIndex(self.keys.applicants, self.keys.applicant_codes)
+        self.query = ""
+        self.matches = None
+
+    def key_matches(self, key, query):
+        return query in key[0] or query in key[1]
+
+    def search(self, query):
+        if not query:
+            return None
+        if self.matches is not None and query == self.query:
+            return self.matches
+
+        rows = len(self.keys)
+        if (self.matches is not None and self.query and self.query in query
+                and len(self.matches) * self.SCAN_RATIO < rows):
+            keys = self.keys
+            self.matches = {app_id for app_id in self.matches if self.key_matches(keys[app_id], query)}
+        elif (self.events.count(query) + self.applicants.count(query)) * self.SCAN_RATIO > rows:
+            # Too many hits to collect string by string, so test every distinct string once and scan the codes
+            self.matches = self.scan(query)
+        else:
+            self.matches = set(self.events.rows_for(self.events.matching_codes(query)))
+            self.matches.update(self.applicants.rows_for(self.applicants.matching_codes(query)))
+        self.query = query
+        return self.matches
+
+    def scan(self, query):
+        events, applicants = self.events.flags(query), self.applicants.flags(query)
+        event_codes, applicant_codes = self.keys.event_codes, self.keys.applicant_codes
+        if 1 not in applicants:
+            return {app_id for app_id, code in enumerate(event_codes) if events[code]}
+        if 1 not in events:
+            return {app_id for app_id, code in enumerate(applicant_codes) if applicants[code]}
+        return {app_id for app_id, (event, applicant) in enumerate(zip(event_codes, applicant_codes))
+                if events[event] or applicants[applicant]}
+
+
+class EmailNotifier:
+    def __init__(self, smtp_config, batch_delay=1.0, digest_threshold=5, max_retries=5, retry_delay=1.0):
+        self.smtp_config = smtp_config
+        self.batch_delay = batch_delay
+        self.digest_threshold = digest_threshold
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.server = None
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def notify(self, receiver, subject, body):
+        self.queue.put((receiver, subject, body))
+
+    def close(self, timeout=10):
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def run(self):
+        running = True
+        while running:
+            item = self.queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.batch_delay
+            while True:
+                try:
+                    item = self.queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+
+            self.deliver(batch)
+        self.disconnect()
+
+    def deliver(self, batch):
+        by_receiver = {}
+        for receiver, subject, body in batch:
+            by_receiver.setdefault(receiver, []).append((subject, body))
+
+        for receiver, notifications in by_receiver.items():
+            if len(notifications) >= self.digest_threshold:
+                subject = f"Applications Digest: {len(notifications)} notifications"
+                body = "\n\n".join(f"{subject}\n{body}" for subject, body in notifications)
+                self.send_with_retry(self.build_message(receiver, subject, body))
+            else:
+                for subject, body in notifications:
+                    self.send_with_retry(self.build_message(receiver, subject, body))
+
+    def build_message(self, receiver, subject, body):
+        msg = EmailMessage()
+        msg.set_content(body)
+        msg['Subject'] = subject
+        msg['From'] = self.smtp_config["sender_email"]
+        msg['To'] = receiver
+        return msg
+
+    def send_with_retry(self, msg):
+        for attempt in range(self.max_retries):
+            try:
+                self.connect().send_message(msg)
+                return True
+            except (smtplib.SMTPException, OSError) as e:
+                error = e
+                self.disconnect()
+                if attempt + 1 < self.max_retries:
+                    time.sleep(self.retry_delay * 2 ** attempt)
+        print(f"Failed to send email: {error}")
+        return False
+
+    def connect(self):
+        if self.server is None:
+            server = smtplib.SMTP(self.smtp_config["smtp_server"], self.smtp_config["smtp_port"], timeout=30)
+            try:
+                if self.smtp_config.get("use_tls", True):
+                    server.starttls()
+                server.ehlo_or_helo_if_needed()
+                if self.smtp_config["sender_password"] and server.has_extn("auth"):
+                    server.login(self.smtp_config["sender_email"], self.smtp_config["sender_password"])
+            except Exception:
+                server.close()
+                raise
+            self.server = server
+        return self.server
+
+    def disconnect(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                self.server.close()
+            self.server = None
+
+
+class BackgroundJob:
+    def __init__(self):
+        self.events = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        try:
+            self.events.put(self.work())
+        except Exception as e:
+            self.events.put(("error", str(e)))
+
+    def work(self):
+        raise NotImplementedError
+
+    def report_progress(self, fraction, text):
+        self.events.put(("progress", (fraction, text)))
+
+
+class Profiler:
+    BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.enabled = False
+        self.wrapped = []
+        self.version = 0
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.timings = {}
+            self.counters = {}
+            self.version += 1
+
+    def instrument(self, target, names, prefix):
+        for name in names:
+            setattr(target, name, self.timed(f"{prefix}.{name}", getattr(target, name)))
+            self.wrapped.append((target, name))
+        self.enabled = True
+
+    def watch(self, job):
+        if self.enabled:
+            job.work = self.timed(f"{type(job).__name__}.work", job.work)
+
+    def restore(self):
+        for target, name in self.wrapped:
+            delattr(target, name)
+        self.wrapped = []
+        self.enabled = False
+
+    def timed(self, name, func):
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                self.record(name, time.perf_counter() - start, True)
+                raise
+            self.record(name, time.perf_counter() - start)
+            return result
+        return wrapper
+
+    def record(self, name, seconds, failed=False):
+        ms = seconds * 1000
+        with self.lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                timing = self.timings[name] = {
+                    "calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "histogram": [0] * (len(self.BOUNDS) + 1)
+                }
+            timing["calls"] += 1
+            timing["errors"] += failed
+            timing["total_ms"] += ms
+            timing["max_ms"] = max(timing["max_ms"], ms)
+            timing["histogram"][bisect.bisect_left(self.BOUNDS, ms)] += 1
+            self.version += 1
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+            self.version += 1
+
+    def percentile(self, histogram, fraction):
+        target = sum(histogram) * fraction
+        seen = 0
+        for bound, calls in zip(self.BOUNDS, histogram):
+            seen += calls
+            if seen >= target:
+                return f"<={bound}"
+        return f">{self.BOUNDS[-1]}"
+
+    def histogram_text(self, histogram):
+        labels = [f"<={bound}" for bound in self.BOUNDS] + [f">{self.BOUNDS[-1]}"]
+        return " ".join(f"{label}:{calls}" for label, calls in zip(labels, histogram) if calls)
+
+    def rows(self):
+        with self.lock:
+            timings = {name: dict(timing, histogram=list(timing["histogram"]))
+                       for name, timing in self.timings.items()}
+            counters = dict(self.counters)
+
+        rows = []
+        for name, timing in sorted(timings.items(), key=lambda item: -item[1]["total_ms"]):
+            rows.append((
+                name, timing["calls"], timing["errors"], f"{timing['total_ms']:.1f}",
+                f"{timing['total_ms'] / timing['calls']:.2f}", f"{timing['max_ms']:.1f}",
+                self.percentile(timing["histogram"], 0.95), self.histogram_text(timing["histogram"])
+            ))
+        for name, value in sorted(counters.items()):
+            rows.append((name, value, "", "", "", "", "", ""))
+        return rows
+
+    def dump(self, file_path):
+        with self.lock:
+            data = {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "bounds_ms": list(self.BOUNDS),
+                "timings": self.timings,
+                "counters": self.counters
+            }
+            with open(file_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=2)
+
+
+def view_filter(search="", seat_filter="All", fts=False):
+    clauses = []
+    params = []
+    if search and fts and len(search) >= 3:
+        clauses.append("id IN (SELECT rowid FROM applications_fts WHERE applications_fts MATCH ?)")
+        params.append('"' + search.replace('"', '""') + '"')
+    elif search:
+        clauses.append("(instr(py_lower(event), ?) > 0 OR instr(py_lower(applicant), ?) > 0)")
+        params += [search, search]
+    if seat_filter.endswith("+"):
+        clauses.append("seats >= ?")
+        params.append(int(seat_filter[:-1]))
+    elif seat_filter != "All":
+        clauses.append("seats = ?")
+        params.append(int(seat_filter))
+    return clauses, params
+
+
+def build_view_query(columns, search="", seat_filter="All", sort_column=None, sort_reverse=False, fts=False):
+    clauses, params = view_filter(search, seat_filter, fts)
+    query = f"SELECT {columns} FROM applications"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    if sort_column in ("event", "applicant", "seats"):
+        direction = "DESC" if sort_reverse else "ASC"
+        query += f" ORDER BY {sort_column} {direction}, id {direction}"
+    else:
+        query += " ORDER BY position, id"
+    return query, params
+
+
+class DatabaseView:
+    # The ids of a view answered by the database, read a window at a time instead of as one list
+    def __init__(self, conn, search="", seat_filter="All", sort_column=None, sort_reverse=False, fts=False):
+        self.conn = conn
+        self.clauses, self.params = view_filter(search, seat_filter, fts)
+        self.sort_key = sort_column if sort_column in ("event", "applicant", "seats") else "position"
+        self.reverse = self.sort_key != "position" and sort_reverse
+        self.query, _ = build_view_query("id", search, seat_filter, sort_column, sort_reverse, fts)
+        self.count = None
+
+    def __len__(self):
+        if self.count is None:
+            self.count = self.conn.execute(self.select("COUNT(*)"), self.params).fetchone()[0]
+        return self.count
+
+    def __iter__(self):
+        return (app_id for app_id, in self.conn.execute(self.query, self.params))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if stop <= start:
+                return []
+            return [app_id for app_id, in self.conn.execute(
+                f"{self.query} LIMIT ? OFFSET ?", (*self.params, stop - start, start))][::step]
+        if index < 0:
+            index += len(self)
+        row = self.conn.execute(f"{self.query} LIMIT 1 OFFSET ?", (*self.params, index)).fetchone() \
+            if index >= 0 else None
+        if row is None:
+            raise IndexError(index)
+        return row[0]
+
+    def select(self, columns, *clauses):
+        clauses = [*self.clauses, *clauses]
+        return f"SELECT {columns} FROM applications" + (" WHERE " + " AND ".join(clauses) if clauses else "")
+
+    def at(self, indexes):
+        # Ids at several indexes of the view, read in one pass
+        indexes = set(indexes)
+        if not indexes:
+            return {}
+        start = min(indexes)
+        rows = self.conn.execute(f"{self.query} LIMIT ? OFFSET ?", (*self.params, max(indexes) - start + 1, start))
+        return {index: app_id for index, (app_id,) in enumerate(rows, start) if index in indexes}
+
+    def indexes(self, app_ids):
+        # Indexes of the rows in the view; rows outside the view are left out
+        if len(app_ids) * 8 > len(self):
+            return {app_id: index for index, app_id in enumerate(self) if app_id in app_ids}
+
+        keys = []
+        app_ids = list(app_ids)
+        for start in range(0, len(app_ids), 500):
+            chunk = app_ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            keys.extend(self.conn.execute(self.select(f"{self.sort_key}, id", f"id IN ({placeholders})"),
+                                          (*self.params, *chunk)))
+        keys.sort(reverse=self.reverse)
+
+        # Each count only covers the rows since the previous key, so the view is walked once
+        before = ">" if self.reverse else "<"
+        after = "<=" if self.reverse else ">="
+        indexes = {}
+        count = 0
+        previous = None
+        for key in keys:
+            if previous is None:
+                count = self.conn.execute(self.select("COUNT(*)", f"({self.sort_key}, id) {before} (?, ?)"),
+                                          (*self.params, *key)).fetchone()[0]
+            else:
+                count += self.conn.execute(
+                    self.select("COUNT(*)", f"({self.sort_key}, id) {after} (?, ?)",
+                                f"({self.sort_key}, id) {before} (?, ?)"),
+                    (*self.params, *previous, *key)
+                ).fetchone()[0]
+            previous = key
+            indexes[key[1]] = count
+        return indexes
+
+
+def connect_db(db_file, busy_timeout=5000):
+    conn = sqlite3.connect(db_file)
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.create_function("py_lower", 1, str.lower, deterministic=True)
+    return conn
+
+
+UNDO_SWAP = json.dumps([["swap"]])
+
+
+CHANGE_LOG_LIMIT = 10000
+
+
+def writer_id():
+    # Tags this process's rows in the change log; never shared, even by two processes on one host
+    return uuid.uuid4().hex
+
+
+def station_key(file_path=None):
+    # Owns this station's undo history across restarts, so it lives in a local file, never next to a shared database
+    file_path = file_path or os.getenv("STATION_KEY_FILE", "station.key")
+    try:
+        with open(file_path, encoding="utf-8") as file:
+            key = file.read().strip()
+        if key:
+            return key
+    except FileNotFoundError:
+        pass
+
+    key = uuid.uuid4().hex
+    try:
+        with AtomicFile(file_path, "w", encoding="utf-8") as file:
+            file.write(key)
+    except IOError:
+        pass
+    return key
+
+
+def log_changes(conn, app_ids, writer):
+    conn.executemany("INSERT INTO changes (app_id, station) VALUES (?, ?)", [(app_id, writer) for app_id in app_ids])
+    conn.execute("DELETE FROM changes WHERE seq <= (SELECT MAX(seq) FROM changes) - ?", (CHANGE_LOG_LIMIT,))
+    return last_change(conn)
+
+
+def log_reload(conn, writer):
+    conn.execute("INSERT INTO changes (app_id, station) VALUES (NULL, ?)", (writer,))
+
+
+def is_busy(error):
+    return "locked" in str(error) or "busy" in str(error)
+
+
+def next_version(conn):
+    return conn.execute("SELECT IFNULL(MAX(version), 0) + 1 FROM applications").fetchone()[0]
+
+
+def last_change(conn):
+    return conn.execute("SELECT IFNULL(MAX(seq), 0) FROM changes").fetchone()[0]
+
+
+def read_changes(conn, since):
+    first = conn.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+    rows = conn.execute("SELECT seq, app_id FROM changes WHERE seq > ? ORDER BY seq", (since,)).fetchall()
+    return rows, first is not None and first > since + 1
+
+
+def changed_elsewhere(conn, since, writer):
+    first = conn.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+    return since is None or (first is not None and first > since + 1) or conn.execute(
+        "SELECT EXISTS (SELECT 1 FROM changes WHERE seq > ? AND station IS NOT ?)", (since, writer)
+    ).fetchone()[0]
+
+
+def allocate_id(conn):
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("INSERT OR IGNORE INTO sequences (name, value) VALUES ('applications', 0)")
+        conn.execute("""
+            UPDATE sequences SET value = MAX(value, (SELECT IFNULL(MAX(id), 0) FROM applications)) + 1
+            WHERE name = 'applications'
+        """)
+        return conn.execute("SELECT value FROM sequences WHERE name = 'applications'").fetchone()[0]
+
+
+def journal_import(conn, station, label="Import CSV"):
+    # The backup table only holds the latest swap, so every older swap entry is gone for all stations
+    conn.execute(
+        """
+        DELETE FROM journal WHERE undo = ?
+            OR (station = ? AND (undone = 1 OR seq <= (SELECT MAX(seq) FROM journal WHERE undo = ?)))
+        """,
+        (UNDO_SWAP, station, UNDO_SWAP)
+    )
+    conn.execute(
+        "INSERT INTO journal (label, undo, redo, station, change_seq) VALUES (?, ?, ?, ?, ?)",
+        (label, UNDO_SWAP, UNDO_SWAP, station, last_change(conn))
+    )
+
+
+def backup_applications(conn):
+    conn.execute("DROP TABLE IF EXISTS applications_undo")
+    conn.execute("CREATE TABLE applications_undo AS SELECT * FROM applications")
+
+
+DEDUPE_POLICIES = ["skip", "merge", "replace"]
+
+
+def dedupe_key(event, applicant):
+    return " ".join(event.split()).casefold(), " ".join(applicant.split()).casefold()
+
+
+class DedupeIndex:
+    def __init__(self, policy):
+        if policy not in DEDUPE_POLICIES:
+            raise ValueError(f"Unknown dedupe policy: {policy}")
+        self.policy = policy
+        self.keys = {}
+        self.duplicates = 0
+        self.merged = []
+        self.replaced = []
+
+    def add(self, app_id, app):
+        kept = self.keys.setdefault(dedupe_key(app[0], app[1]), app_id)
+        if kept == app_id:
+            return True
+
+        self.duplicates += 1
+        if self.policy == "merge":
+            self.merged.append((app[2], kept))
+        elif self.policy == "replace":
+            self.replaced.append((*app, kept))
+        return False
+
+    def write(self, conn, table):
+        conn.executemany(f"UPDATE {table} SET seats = seats + ?, version = version + 1 WHERE id = ?", self.merged)
+        conn.executemany(
+            f"UPDATE {table} SET event = ?, applicant = ?, seats = ?, version = version + 1 WHERE id = ?",
+            self.replaced
+        )
+        changed = {row[-1] for row in self.merged} | {row[-1] for row in self.replaced}
+        self.merged = []
+        self.replaced = []
+        return changed
+
+
+def has_search_index(conn):
+    return conn.execute(
+        "SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE name = 'applications_fts')"
+    ).fetchone()[0]
+
+
+def rebuild_search_index(conn):
+    if has_search_index(conn):
+        conn.execute("INSERT INTO applications_fts (applications_fts) VALUES ('rebuild')")
+
+
+def init_database(conn, station=None):
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS applications (
+                id INTEGER PRIMARY KEY,
+                event TEXT,
+                applicant TEXT,
+                seats INTEGER,
+                position INTEGER,
+                version INTEGER NOT NULL DEFAULT 1
+            )
+        """)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(applications)")]
+        if "position" not in columns:
+            conn.execute("ALTER TABLE applications ADD COLUMN position INTEGER")
+            conn.execute("UPDATE applications SET position = id")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_position ON applications (position)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_event ON applications (event)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_applicant ON applications (applicant)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_seats ON applications (seats, position)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS journal (
+                seq INTEGER PRIMARY KEY,
+                label TEXT,
+                undo TEXT,
+                redo TEXT,
+                undone INTEGER NOT NULL DEFAULT 0,
+                station TEXT,
+                change_seq INTEGER
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                app_id INTEGER,
+                station TEXT
+            )
+        """)
+        if "station" not in [row[1] for row in conn.execute("PRAGMA table_info(journal)")]:
+            conn.execute("ALTER TABLE journal ADD COLUMN station TEXT")
+            conn.execute("ALTER TABLE journal ADD COLUMN change_seq INTEGER")
+            conn.execute("UPDATE journal SET station = ?", (station,))
+        if "station" not in [row[1] for row in conn.execute("PRAGMA table_info(changes)")]:
+            conn.execute("ALTER TABLE changes ADD COLUMN station TEXT")
+        conn.execute("CREATE TABLE IF NOT EXISTS sequences (name TEXT PRIMARY KEY, value INTEGER)")
+        if "version" not in columns:
+            conn.execute("ALTER TABLE applications ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+            conn.execute("DROP TABLE IF EXISTS applications_undo")
+            conn.execute("DELETE FROM journal WHERE undo = ?", (UNDO_SWAP,))
+
+        if not has_search_index(conn):
+            try:
+                conn.execute("""
+                    CREATE VIRTUAL TABLE applications_fts USING fts5(
+                        event, applicant, content='applications', content_rowid='id', tokenize='trigram'
+                    )
+                """)
+                rebuild_search_index(conn)
+            except sqlite3.OperationalError:
+                pass
+    return has_search_index(conn)
+
+
+class DatabaseStatsJob(BackgroundJob):
+    def __init__(self, db_file, busy_timeout=5000):
+        super().__init__()
+        self.db_file = db_file
+        self.busy_timeout = busy_timeout
+
+    def work(self):
+        conn = connect_db(self.db_file, self.busy_timeout)
+        try:
+            stats = DatabaseStats()
+            stats.refresh(conn)
+            return "done", stats
+        finally:
+            conn.close()
+
+
+class CsvImporter(BackgroundJob):
+    def __init__(self, db_file, file_path, dedupe=None, chunk_size=5000, station=None, writer=None):
+        super().__init__()
+        self.db_file = db_file
+        self.file_path = file_path
+        self.dedupe = DedupeIndex(dedupe) if dedupe else None
+        self.chunk_size = chunk_size
+        self.station = station or station_key()
+        self.writer = writer or writer_id()
+        self.bytes_read = 0
+        self.total_bytes = 0
+        self.accepted = 0
+        self.rejected = 0
+
+    def read_lines(self, file):
+        for line in file:
+            self.bytes_read += len(line)
+            yield line.decode("utf-8")
+
+    def validate(self, row):
+        if len(row) != 3:
+            return None
+        event, applicant = row[0], row[1]
+        try:
+            seats = int(row[2])
+        except ValueError:
+            return None
+        if not 1 <= seats <= ApplicationStore.MAX_SEATS or not event or not applicant:
+            return None
+        return event, applicant, seats
+
+    def work(self):
+        self.total_bytes = os.path.getsize(self.file_path)
+        conn = connect_db(self.db_file)
+        try:
+            conn.execute("DROP TABLE IF EXISTS applications_import")
+            conn.execute("""
+                CREATE TABLE applications_import (
+                    id INTEGER PRIMARY KEY,
+                    event TEXT,
+                    applicant TEXT,
+                    seats INTEGER,
+                    position INTEGER,
+                    version INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+            conn.commit()
+
+            with open(self.file_path, "rb") as file:
+                reader = csv.reader(self.read_lines(file))
+                next(reader, None)
+                chunk = []
+                for row in reader:
+                    app = self.validate(row)
+                    if app is None:
+                        self.rejected += 1
+                        continue
+
+                    if self.dedupe is not None and not self.dedupe.add(self.accepted + 1, app):
+                        continue
+
+                    self.accepted += 1
+                    chunk.append((self.accepted, *app, self.accepted * OrderIndex.GAP))
+                    if len(chunk) >= self.chunk_size:
+                        self.write_chunk(conn, chunk)
+                        chunk = []
+                        if self.cancelled.is_set():
+                            break
+                else:
+                    self.write_chunk(conn, chunk)
+
+            if self.cancelled.is_set() or not self.accepted:
+                conn.execute("DROP TABLE applications_import")
+                conn.commit()
+                return ("cancelled" if self.cancelled.is_set() else "empty"), self.counts()
+
+            conn.execute("BEGIN")
+            version = next_version(conn)
+            backup_applications(conn)
+            conn.execute("DELETE FROM applications")
+            conn.execute("""
+                INSERT INTO applications (id, event, applicant, seats, position, version)
+                SELECT id, event, applicant, seats, position, ? FROM applications_import
+            """, (version,))
+            conn.execute("DROP TABLE applications_import")
+            rebuild_search_index(conn)
+            log_reload(conn, self.writer)
+            journal_import(conn, self.station)
+            conn.commit()
+            return "done", self.counts()
+        finally:
+            conn.close()
+
+    def counts(self):
+        return self.accepted, self.rejected, self.dedupe.duplicates if self.dedupe is not None else 0
+
+    def write_chunk(self, conn, chunk):
+        conn.executemany(
+            "INSERT INTO applications_import (id, event, applicant, seats, position) VALUES (?, ?, ?, ?, ?)",
+            chunk
+        )
+        if self.dedupe is not None:
+            self.dedupe.write(conn, "applications_import")
+        conn.commit()
+        text = f"Imported: {self.accepted}   Rejected: {self.rejected}"
+        if self.dedupe is not None:
+            text += f"   Duplicates: {self.dedupe.duplicates}"
+        self.report_progress(self.bytes_read / self.total_bytes if self.total_bytes else 1, text)
+
+
+class DedupeJob(BackgroundJob):
+    def __init__(self, db_file, policy, chunk_size=5000, station=None, writer=None):
+        super().__init__()
+        self.db_file = db_file
+        self.dedupe = DedupeIndex(policy)
+        self.chunk_size = chunk_size
+        self.station = station or station_key()
+        self.writer = writer or writer_id()
+
+    def work(self):
+        conn = connect_db(self.db_file)
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM applications").fetchone()[0]
+            duplicates = []
+            cursor = conn.execute("SELECT id, event, applicant, seats FROM applications ORDER BY position, id")
+            for scanned, (app_id, *app) in enumerate(cursor, 1):
+                if not self.dedupe.add(app_id, app):
+                    duplicates.append((app_id,))
+                if scanned % self.chunk_size == 0:
+                    self.report_progress(scanned / total, f"Checked: {scanned}   Duplicates: {len(duplicates)}")
+                    if self.cancelled.is_set():
+                        return "cancelled", 0
+
+            if not duplicates:
+                return "done", 0
+
+            conn.execute("BEGIN")
+            backup_applications(conn)
+            conn.executemany("DELETE FROM applications WHERE id = ?", duplicates)
+            changed = self.dedupe.write(conn, "applications")
+            rebuild_search_index(conn)
+            log_changes(conn, [app_id for app_id, in duplicates] + sorted(changed), self.writer)
+            journal_import(conn, self.station, "Remove Duplicates")
+            conn.commit()
+            return "done", len(duplicates)
+        finally:
+            conn.close()
+
+
+class AtomicFile:
+    def __init__(self, file_path, mode="w", **kwargs):
+        self.file_path = file_path
+        self.keep = True
+        self.file = tempfile.NamedTemporaryFile(
+            mode, dir=os.path.dirname(os.path.abspath(file_path)), prefix=os.path.basename(file_path) + ".",
+            suffix=".part", delete=False, **kwargs
+        )
+
+    def __enter__(self):
+        return self.file
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            self.file.close()
+        finally:
+            if exc_type is None and self.keep:
+                try:
+                    mode = os.stat(self.file_path).st_mode & 0o777
+                except FileNotFoundError:
+                    mode = 0o644
+                os.chmod(self.file.name, mode)
+                os.replace(self.file.name, self.file_path)
+            else:
+                os.remove(self.file.name)
+
+
+class CsvExporter(BackgroundJob):
+    def __init__(self, db_file, file_path, query, params, chunk_size=5000):
+        super().__init__()
+        self.db_file = db_file
+        self.file_path = file_path
+        self.query = query
+        self.params = params
+        self.chunk_size = chunk_size
+
+    def work(self):
+        written = 0
+        conn = connect_db(self.db_file)
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM ({self.query})", self.params).fetchone()[0]
+            cursor = conn.execute(self.query, self.params)
+            output = AtomicFile(self.file_path, "w", newline="", encoding="utf-8", buffering=1 << 20)
+            with output as file:
+                writer = csv.writer(file)
+                writer.writerow(["Event name", "Applicant", "Seats number"])
+                while not self.cancelled.is_set():
+                    rows = cursor.fetchmany(self.chunk_size)
+                    if not rows:
+                        break
+                    writer.writerows(rows)
+                    written += len(rows)
+                    self.report_progress(written / total if total else 1, f"Exported: {written} of {total}")
+                output.keep = not self.cancelled.is_set()
+        finally:
+            conn.close()
+
+        return ("done" if output.keep else "cancelled"), written
+
+
+class JsonSnapshot(BackgroundJob):
+    def __init__(self, db_file, file_path):
+        super().__init__()
+        self.db_file = db_file
+        self.file_path = file_path
+
+    def work(self):
+        written = 0
+        conn = connect_db(self.db_file)
+        try:
+            cursor = conn.execute("SELECT event, applicant, seats FROM applications ORDER BY position")
+            with AtomicFile(self.file_path, "w", encoding="utf-8", buffering=1 << 20) as file:
+                file.write("[")
+                for row in cursor:
+                    file.write(("\n  " if not written else ",\n  ") + json.dumps(row, ensure_ascii=False))
+                    written += 1
+                file.write("\n]\n")
+        finally:
+            conn.close()
+
+        return "done", written
+
+
+class PdfStream:
+    def __init__(self, file):
+        self.file = file
+        self.length = 0
+
+    def __iadd__(self, text):
+        data = text.encode("latin1")
+        self.file.write(data)
+        self.length += len(data)
+        return self
+
+    def __len__(self):
+        return self.length
+
+
+class ReportPDF(FPDF):
+    COL_WIDTHS = [80, 60, 30]
+    HEADERS = ["Event Name", "Applicant", "Seats"]
+    EVENT_COL_WIDTHS = [110, 30, 30]
+    EVENT_HEADERS = ["Event Name", "Applications", "Seats"]
+
+    def __init__(self):
+        super().__init__()
+        self.table = None
+
+    def header(self):
+        if self.table:
+            self.table_header()
+
+    def start_table(self, widths, headers):
+        self.table = widths, headers
+        self.table_header()
+
+    def end_table(self):
+        self.table = None
+
+    def table_header(self):
+        self.set_font("Arial", 'B', 10)
+        for width, header in zip(*self.table):
+            self.cell(width, 10, txt=header, border=1)
+        self.ln()
+        self.set_font("Arial", size=10)
+
+    def write_to(self, file):
+        if not isinstance(self.buffer, str):
+            file.write(self.output())
+            return
+        self.buffer = PdfStream(file)
+        self.close()
+
+
+class PdfReport(BackgroundJob):
+    def __init__(self, db_file, file_path, query, params, summary=None, event_rows=None, notes=(), chunk_size=2000):
+        super().__init__()
+        self.db_file = db_file
+        self.file_path = file_path
+        self.query = query
+        self.params = params
+        self.summary = summary
+        self.event_rows = event_rows
+        self.notes = notes
+        self.chunk_size = chunk_size
+
+    def work(self):
+        if self.summary is None or self.event_rows is None:
+            self.report_progress(0, "Counting applications...")
+            stats = DatabaseStats()
+            conn = connect_db(self.db_file)
+            try:
+                stats.refresh(conn)
+            finally:
+                conn.close()
+            if self.summary is None:
+                self.summary = report_summary(stats)
+            if self.event_rows is None:
+                self.event_rows = sort_event_rows(stats.rows())
+
+        pdf = ReportPDF()
+        pdf.add_page()
+        pdf.set_font("Arial", size=12)
+
+        pdf.cell(200, 10, txt="Applications Report", ln=1, align='C')
+        pdf.cell(200, 10, txt=f"on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=1, align='C')
+        pdf.ln(10)
+
+        pdf.set_font("Arial", 'B', 12)
+        pdf.cell(200, 10, txt="Summary Statistics", ln=1)
+        pdf.set_font("Arial", size=10)
+        for line in [*self.summary, *self.notes]:
+            pdf.cell(200, 8, txt=line, ln=1)
+        pdf.ln(10)
+
+        if self.event_rows:
+            pdf.set_font("Arial", 'B', 12)
+            pdf.cell(200, 10, txt="Applications by Event", ln=1)
+            pdf.start_table(pdf.EVENT_COL_WIDTHS, pdf.EVENT_HEADERS)
+            for event, applications, seats in self.event_rows:
+                pdf.cell(pdf.EVENT_COL_WIDTHS[0], 8, txt=event[:50], border=1)
+                pdf.cell(pdf.EVENT_COL_WIDTHS[1], 8, txt=str(applications), border=1)
+                pdf.cell(pdf.EVENT_COL_WIDTHS[2], 8, txt=str(seats), border=1)
+                pdf.ln()
+            pdf.end_table()
+            pdf.ln(10)
+
+        pdf.set_font("Arial", 'B', 12)
+        pdf.cell(200, 10, txt="Applications List", ln=1)
+        pdf.start_table(pdf.COL_WIDTHS, pdf.HEADERS)
+
+        written = 0
+        conn = connect_db(self.db_file)
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM ({self.query})", self.params).fetchone()[0]
+            cursor = conn.execute(self.query, self.params)
+            while not self.cancelled.is_set():
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                for event, applicant, seats in rows:
+                    pdf.cell(pdf.COL_WIDTHS[0], 8, txt=event[:35], border=1)
+                    pdf.cell(pdf.COL_WIDTHS[1], 8, txt=applicant[:25], border=1)
+                    pdf.cell(pdf.COL_WIDTHS[2], 8, txt=str(seats), border=1)
+                    pdf.ln()
+                written += len(rows)
+                self.report_progress(written / total if total else 1,
+                                     f"Rendered: {written} of {total} rows, {pdf.page_no()} pages")
+        finally:
+            conn.close()
+
+        if self.cancelled.is_set():
+            return "cancelled", written
+
+        self.report_progress(1, f"Writing {pdf.page_no()} pages to disk...")
+        with AtomicFile(self.file_path, "wb") as file:
+            pdf.write_to(file)
+        return "done", written
+
+
+def sort_event_rows(rows):
+    return sorted(rows, key=lambda row: (-row[1], row[0]))
+
+
+def report_summary(stats):
+    return [
+        f"Total applications: {stats.count}",
+        f"Total seats requested: {stats.total_seats}",
+        f"Unique applicants: {stats.unique_applicants()}"
+    ]
@@ -1,17 +1,63 @@
+import bisect
+import heapq
 import sqlite3
-import csv
 import json
 import os
+import queue
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog, simpledialog
 from datetime import datetime
-from fpdf import FPDF
-import smtplib
-from email.message import EmailMessage
 from dotenv import load_dotenv
 
+from engine import (
+    OrderIndex,
+    longest_increasing_run,
+    BitSet,
+    ApplicationStore,
+    SortedColumnIndex,
+    SeatBuckets,
+    ApplicationStats,
+    EventSummary,
+    DatabaseStats,
+    DatabaseStatsJob,
+    DatabaseView,
+    SearchCache,
+    EmailNotifier,
+    build_view_query,
+    connect_db,
+    UNDO_SWAP,
+    allocate_id,
+    log_changes,
+    log_reload,
+    next_version,
+    last_change,
+    read_changes,
+    is_busy,
+    changed_elsewhere,
+    station_key,
+    writer_id,
+    rebuild_search_index,
+    init_database,
+    CsvImporter,
+    DedupeJob,
+    DEDUPE_POLICIES,
+    CsvExporter,
+    JsonSnapshot,
+    PdfReport,
+    sort_event_rows,
+    report_summary,
+    Profiler
+)
+
 load_dotenv()
 
+PROFILED_METHODS = [
+    "load_data_from_file", "db_flush", "db_save_all", "db_load_all", "db_load_page", "db_write_journal",
+    "load_record", "fetch_rows", "refresh_display", "render_rows", "update_statistics",
+    "update_event_summary", "apply_filters", "sort_by_column", "on_key_move", "on_drag_end",
+    "write_snapshot", "send_email", "undo", "redo"
+]
+
 
 class ApplicationManager:
     def __init__(self, root):
@@ -30,8 +76,9 @@ class ApplicationManager:
         }
 
         self.SMTP_CONFIG = {
-            "smtp_server": "smtp.gmail.com",
-            "smtp_port": 587,
+            "smtp_server": os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+            "smtp_port": int(os.getenv("SMTP_PORT", 587)),
+            "use_tls": os.getenv("SMTP_USE_TLS", "1") != "0",
             "sender_email": os.getenv("SMTP_EMAIL"),
             "sender_password": os.getenv("SMTP_PASSWORD")
         }
@@ -42,22 +89,107 @@ class ApplicationManager:
                 "SMTP credentials not found. Email notifications will be disabled."
             )
 
-        self.original_order = []
-        self.applications = {}
+        self.notifier = EmailNotifier(self.SMTP_CONFIG)
+
+        self.original_order = OrderIndex()
+        self.applications = ApplicationStore()
         self.next_id = 1
-        self.highlighted_items = set()
+        self.highlighted_items = BitSet()
+        self.selected = set()
+        self.rendered = {}
+
+        self.sql_view = os.getenv("SQL_VIEW", "0") == "1"
+        self.row_cache = {}
+        self.fts_enabled = False
+
+        self.search_cache = SearchCache()
+        self.seat_buckets = SeatBuckets()
+        self.stats = DatabaseStats() if self.sql_view else ApplicationStats()
+        self.sort_indexes = {
+            "event": SortedColumnIndex(0),
+            "applicant": SortedColumnIndex(1),
+            "seats": SortedColumnIndex(2)
+        }
+        self.event_summary = self.stats if self.sql_view else EventSummary(self.applications)
+        if self.sql_view:
+            self.indexes = []
+        else:
+            self.indexes = [self.search_cache, self.seat_buckets, self.stats, self.event_summary,
+                            *self.sort_indexes.values()]
+        self.event_window = None
+
+        self.pending_upserts = set()
+        self.pending_deletes = set()
+        self.pending_positions = set()
+
+        self.journal_limit = int(os.getenv("UNDO_LIMIT", 200))
+        self.journal_label = None
+        self.journal_undo = []
+        self.journal_redo = []
+        self.journal_replay = None
 
         self.current_filter = "All"
         self.current_search = ""
+        self.search_delay = int(os.getenv("SEARCH_DEBOUNCE_MS", 250))
+        self.search_job = None
         self.sort_column = None
         self.sort_reverse = False
 
         self.dragging_item = None
+        self.drag_start_index = None
+
+        self.virtual_mode = True
+        self.overscan = 20
+        self.visible_rows = 20
+        self.row_height = 20
+        self.view_ids = []
+        self.view_offset = 0
+        self.window_start = 0
+        self.window_stop = 0
+        self.render_job = None
+
+        self.json_snapshot = os.getenv("JSON_SNAPSHOT", "1") != "0"
+        self.snapshot_delay = 2000
+        self.snapshot_job = None
+        self.snapshot_writer = None
+
+        self.dedupe_policy = os.getenv("DEDUPE_POLICY", "skip")
+        if self.dedupe_policy == "off":
+            self.dedupe_policy = None
+
+        self.lazy_load = os.getenv("LAZY_LOAD", "1") != "0"
+        self.page_size = 2000
+        self.page_key = None
+        self.fully_loaded = True
+        self.load_job = None
+        self.load_total = 0
+
+        self.sync_delay = int(os.getenv("SYNC_INTERVAL_MS", 1000))
+        self.sync_job = None
+        self.data_version = None
+        self.change_seq = 0
+        self.own_changes = []
+        self.station = station_key()
+        self.writer = writer_id()
+        self.busy_timeout = int(os.getenv("BUSY_TIMEOUT_MS", 1000))
+        self.flush_delay = 1000
+        self.flush_job = None
+        self.stats_job = None
+        self.stats_job_flushes = 0
+        self.stats_flushes = 0
+
+        self.profiler = Profiler()
+        self.profile_file = os.getenv("PROFILE_FILE")
+        self.perf_window = None
+        if os.getenv("PROFILE", "0") != "0" or self.profile_file:
+            self.start_profiling()
 
         self.db_init()
         self.load_data_from_file()
         self.setup_ui()
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        if self.sync_delay > 0:
+            self.sync_job = self.root.after(self.sync_delay, self.poll_changes)
 
     def setup_email_dialog(self):
         dialog = tk.Toplevel(self.root)
@@ -100,19 +232,7 @@ class ApplicationManager:
         if not self.SMTP_CONFIG["sender_email"] or not self.SMTP_CONFIG["sender_password"]:
             return
 
-        try:
-            msg = EmailMessage()
-            msg.set_content(body)
-            msg['Subject'] = subject
-            msg['From'] = self.SMTP_CONFIG["sender_email"]
-            msg['To'] = self.email_config["receiver_email"]
-
-            with smtplib.SMTP(self.SMTP_CONFIG["smtp_server"], self.SMTP_CONFIG["smtp_port"]) as server:
-                server.starttls()
-                server.login(self.SMTP_CONFIG["sender_email"], self.SMTP_CONFIG["sender_password"])
-                server.send_message(msg)
-        except Exception as e:
-            print(f"Failed to send email: {e}")
+        self.notifier.notify(self.email_config["receiver_email"], subject, body)
 
     def export_to_pdf(self):
         file_path = filedialog.asksaveasfilename(
@@ -125,50 +245,34 @@ class ApplicationManager:
         if not file_path:
             return
 
-        try:
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_font("Arial", size=12)
-
-            pdf.cell(200, 10, txt="Applications Report", ln=1, align='C')
-            pdf.cell(200, 10, txt=f"on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=1, align='C')
-            pdf.ln(10)
-
-            total_apps = len(self.applications)
-            total_seats = sum(app[2] for app in self.applications.values())
-            unique_applicants = len(set(app[1] for app in self.applications.values()))
-
-            pdf.set_font("Arial", 'B', 12)
-            pdf.cell(200, 10, txt="Summary Statistics", ln=1)
-            pdf.set_font("Arial", size=10)
-            pdf.cell(200, 8, txt=f"Total applications: {total_apps}", ln=1)
-            pdf.cell(200, 8, txt=f"Total seats requested: {total_seats}", ln=1)
-            pdf.cell(200, 8, txt=f"Unique applicants: {unique_applicants}", ln=1)
-            pdf.ln(10)
-
-            pdf.set_font("Arial", 'B', 12)
-            pdf.cell(200, 10, txt="Applications List", ln=1)
-            pdf.set_font("Arial", 'B', 10)
-
-            col_widths = [80, 60, 30]
-            headers = ["Event Name", "Applicant", "Seats"]
-            for i, header in enumerate(headers):
-                pdf.cell(col_widths[i], 10, txt=header, border=1)
-            pdf.ln()
-
-            pdf.set_font("Arial", size=10)
-            for app_id in self.original_order:
-                if app_id in self.applications:
-                    event, applicant, seats = self.applications[app_id]
-                    pdf.cell(col_widths[0], 8, txt=event[:35], border=1)
-                    pdf.cell(col_widths[1], 8, txt=applicant[:25], border=1)
-                    pdf.cell(col_widths[2], 8, txt=str(seats), border=1)
-                    pdf.ln()
-
-            pdf.output(file_path)
-            messagebox.showinfo("Success", "PDF report generated successfully")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate PDF: {str(e)}")
+        if self.stats_job is None and (self.fully_loaded or self.sql_view):
+            summary, event_rows = report_summary(self.stats), self.event_rows()
+        else:
+            # Still paging in or counting, so the report job totals the database itself
+            summary, event_rows = None, None
+
+        notes = []
+        if self.view_is_narrowed() and messagebox.askyesno(
+                "Export", "Include only the applications in the current view (search, filter and sort)?"):
+            query, params = build_view_query("event, applicant, seats", self.current_search, self.current_filter,
+                                             self.sort_column, self.sort_reverse, self.fts_enabled)
+            notes.append(f"Applications in this report: {len(self.view_ids)}")
+        else:
+            query, params = build_view_query("event, applicant, seats")
+
+        if not self.db_flush():
+            return
+
+        def finish(kind, data):
+            if kind == "done":
+                messagebox.showinfo("Success", "PDF report generated successfully")
+            elif kind == "cancelled":
+                messagebox.showinfo("Info", "PDF report cancelled")
+            else:
+                messagebox.showerror("Error", f"Failed to generate PDF: {data}")
+
+        self.run_with_progress(PdfReport(self.db_file, file_path, query, params, summary, event_rows, notes),
+                               "Generating PDF", finish)
 
     def setup_statistics_panel(self):
         self.stats_frame = tk.Frame(self.root, bd=1, relief=tk.SUNKEN)
@@ -188,61 +292,905 @@ class ApplicationManager:
             tk.Label(self.stats_frame, textvariable=self.stats_vars[var_name],
                      width=10, anchor="w").grid(row=0, column=i * 2 + 1, padx=5, sticky="w")
 
+        tk.Label(self.stats_frame, text="Seats Distribution:").grid(row=1, column=0, padx=5, sticky="e")
+        self.stats_vars["seat_buckets"] = tk.StringVar()
+        tk.Label(self.stats_frame, textvariable=self.stats_vars["seat_buckets"],
+                 anchor="w").grid(row=1, column=1, columnspan=7, padx=5, sticky="w")
+        self.stats_vars["loading"] = tk.StringVar()
+        tk.Label(self.stats_frame, textvariable=self.stats_vars["loading"],
+                 anchor="e").grid(row=1, column=8, padx=5, sticky="e")
+
         self.update_statistics()
 
     def update_statistics(self):
-        total_apps = len(self.applications)
-        total_seats = sum(app[2] for app in self.applications.values())
-        unique_apps = len(set(app[1] for app in self.applications.values()))
-        avg_seats = total_seats / total_apps if total_apps > 0 else 0
+        self.stats_vars["total_apps"].set(str(self.stats.count))
+        self.stats_vars["loading"].set("" if self.fully_loaded or self.sql_view else
+                                       f"Loading: {len(self.applications)} of {self.load_total}")
+        self.stats_vars["total_seats"].set(str(self.stats.total_seats))
+        self.stats_vars["unique_apps"].set(str(self.stats.unique_applicants()))
+        self.stats_vars["avg_seats"].set(f"{self.stats.average_seats():.1f}")
+
+        bucket_counts = self.stats.counts() if self.sql_view else self.seat_buckets.counts()
+        self.stats_vars["seat_buckets"].set("   ".join(
+            f"{option}: {bucket_counts.get(option, 0)}" for option in ["1", "2", "3", "4", "5+"]
+        ))
+        self.update_event_summary()
+
+    def event_rows(self):
+        return sort_event_rows(self.event_summary.rows())
+
+    def show_event_summary(self):
+        if self.event_window is not None:
+            self.event_window.lift()
+            return
+
+        self.event_window = tk.Toplevel(self.root)
+        self.event_window.title("Applications by Event")
+        self.event_window.protocol("WM_DELETE_WINDOW", self.close_event_summary)
+
+        frame = tk.Frame(self.event_window)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.event_tree = ttk.Treeview(frame, columns=("event", "applications", "seats"), show="headings")
+        for col, text, width in [("event", "Event name", 300), ("applications", "Applications", 100),
+                                 ("seats", "Seats", 100)]:
+            self.event_tree.heading(col, text=text)
+            self.event_tree.column(col, width=width, anchor="w" if col == "event" else "center")
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.event_tree.yview)
+        self.event_tree.configure(yscrollcommand=scrollbar.set)
+        self.event_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.event_version = None
+        self.update_event_summary()
+
+    def close_event_summary(self):
+        self.event_window.destroy()
+        self.event_window = None
+
+    def update_event_summary(self):
+        if self.event_window is None or self.event_version == self.event_summary.version:
+            return
+
+        self.event_version = self.event_summary.version
+        self.event_tree.delete(*self.event_tree.get_children())
+        for row in self.event_rows():
+            self.event_tree.insert("", tk.END, values=row)
+
+    def start_profiling(self):
+        self.profiler.instrument(self, PROFILED_METHODS, "ApplicationManager")
+        self.profiler.instrument(self.notifier, ["connect", "send_with_retry"], "EmailNotifier")
+
+    def toggle_profiling(self):
+        if self.profiler.enabled:
+            self.profiler.restore()
+        else:
+            self.start_profiling()
+
+    def toggle_performance_panel(self):
+        if self.perf_window is not None:
+            self.close_performance_panel()
+            return
 
-        self.stats_vars["total_apps"].set(str(total_apps))
-        self.stats_vars["total_seats"].set(str(total_seats))
-        self.stats_vars["unique_apps"].set(str(unique_apps))
-        self.stats_vars["avg_seats"].set(f"{avg_seats:.1f}")
+        self.perf_window = tk.Toplevel(self.root)
+        self.perf_window.title("Performance")
+        self.perf_window.protocol("WM_DELETE_WINDOW", self.close_performance_panel)
+
+        controls = tk.Frame(self.perf_window)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        self.perf_var = tk.BooleanVar(value=self.profiler.enabled)
+        tk.Checkbutton(controls, text="Record", variable=self.perf_var,
+                       command=self.toggle_profiling).pack(side=tk.LEFT)
+        tk.Button(controls, text="Reset", command=self.profiler.reset).pack(side=tk.LEFT, padx=5)
+        tk.Button(controls, text="Dump...", command=self.dump_profile).pack(side=tk.LEFT)
+
+        frame = tk.Frame(self.perf_window)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        columns = [("name", "Operation", 260), ("calls", "Calls", 60), ("errors", "Errors", 60),
+                   ("total", "Total ms", 80), ("avg", "Avg ms", 70), ("max", "Max ms", 70),
+                   ("p95", "p95 ms", 70), ("histogram", "Histogram (ms: calls)", 320)]
+        self.perf_tree = ttk.Treeview(frame, columns=[col for col, text, width in columns], show="headings")
+        for col, text, width in columns:
+            self.perf_tree.heading(col, text=text)
+            self.perf_tree.column(col, width=width, anchor="w" if col in ("name", "histogram") else "center")
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.perf_tree.yview)
+        self.perf_tree.configure(yscrollcommand=scrollbar.set)
+        self.perf_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.perf_version = None
+        self.update_performance_panel()
+
+    def close_performance_panel(self):
+        self.root.after_cancel(self.perf_job)
+        self.perf_window.destroy()
+        self.perf_window = None
+
+    def update_performance_panel(self):
+        if self.perf_version != self.profiler.version:
+            self.perf_version = self.profiler.version
+            self.perf_tree.delete(*self.perf_tree.get_children())
+            for row in self.profiler.rows():
+                self.perf_tree.insert("", tk.END, values=row)
+        self.perf_job = self.root.after(1000, self.update_performance_panel)
+
+    def dump_profile(self):
+        file_path = filedialog.asksaveasfilename(
+            title="Dump Performance Data",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            defaultextension=".json",
+            initialfile="performance"
+        )
+
+        if not file_path:
+            return
+
+        try:
+            self.profiler.dump(file_path)
+        except IOError as e:
+            messagebox.showerror("Error", f"Failed to dump performance data: {str(e)}")
+
+    def add_record(self, app_id, app, rank=None, version=0):
+        self.applications[app_id] = app
+        self.applications.set_version(app_id, version)
+        self.original_order.append(app_id, rank)
+        for index in self.indexes:
+            index.add(app_id, app)
+        if app_id >= self.next_id:
+            self.next_id = app_id + 1
+
+    def update_record(self, app_id, app):
+        old_app = self.applications[app_id]
+        for index in self.indexes:
+            index.remove(app_id, old_app)
+        self.applications[app_id] = app
+        for index in self.indexes:
+            index.add(app_id, app)
+
+    def remove_record(self, app_id):
+        app = self.applications.pop(app_id)
+        self.original_order.remove(app_id)
+        self.highlighted_items.discard(app_id)
+        self.selected.discard(app_id)
+        for index in self.indexes:
+            index.remove(app_id, app)
+
+    def clear_records(self):
+        self.applications.clear()
+        self.original_order = OrderIndex()
+        self.next_id = 1
+        self.highlighted_items = BitSet()
+        for index in self.indexes:
+            index.clear()
 
     def db_init(self):
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS applications (
-                    id INTEGER PRIMARY KEY,
-                    event TEXT,
-                    applicant TEXT,
-                    seats INTEGER
+        self.conn = connect_db(self.db_file, self.busy_timeout)
+        self.fts_enabled = init_database(self.conn, self.station)
+        self.data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if self.sql_view:
+            self.refresh_stats()
+
+    def mark_dirty(self, app_id):
+        self.pending_deletes.discard(app_id)
+        self.pending_upserts.add(app_id)
+
+    def mark_deleted(self, app_id):
+        self.pending_upserts.discard(app_id)
+        self.pending_deletes.add(app_id)
+
+    def mark_positions_changed(self, app_ids):
+        self.pending_positions.update(app_ids)
+
+    def move_blocks(self, blocks):
+        app_ids = [app_id for rows, after, before in blocks for app_id in rows]
+        self.load_records(app_ids)
+        old_indexes = self.order_indexes(app_ids)
+        for rows, after, before in blocks:
+            self.place_block(rows, after, before)
+        new_indexes = self.order_indexes(app_ids)
+        for app_id in app_ids:
+            if old_indexes[app_id] != new_indexes[app_id]:
+                self.journal("Move", ["place", app_id, old_indexes[app_id]], ["place", app_id, new_indexes[app_id]])
+
+    def place_block(self, app_ids, after=None, before=None):
+        # Puts the rows, in the given order, right after one row or right before another in the original order
+        self.load_records([*app_ids, before if after is None else after])
+        if self.fully_loaded:
+            for app_id in app_ids:
+                self.original_order.remove(app_id)
+            index = self.original_order.index(after) + 1 if after is not None else self.original_order.index(before)
+            self.mark_positions_changed(self.original_order.place(app_ids, index))
+            return
+
+        db_keys, memory_keys = self.pending_keys(exclude=app_ids)
+        if after is not None:
+            low = self.original_order.rank(after), after
+            high = self.neighbor_key(low, db_keys, memory_keys)
+        else:
+            high = self.original_order.rank(before), before
+            low = self.neighbor_key(high, db_keys, memory_keys, reverse=True)
+        self.fill_slot(app_ids, low[0] if low else None, high[0] if high else None)
+
+    def place_rows(self, placements):
+        # Puts rows at the given indexes of the original order, the other rows keep their order
+        placements = sorted(placements, key=lambda placement: placement[1])
+        app_ids = [app_id for app_id, index in placements]
+        self.load_records(app_ids)
+        runs = []
+        for app_id, index in placements:
+            if runs and runs[-1][1] + len(runs[-1][0]) == index:
+                runs[-1][0].append(app_id)
+            else:
+                runs.append(([app_id], index))
+
+        if self.fully_loaded:
+            for app_id in app_ids:
+                self.original_order.remove(app_id)
+            for rows, index in runs:
+                self.mark_positions_changed(self.original_order.place(rows, min(index, len(self.original_order))))
+            return
+
+        # Each run follows the row that many places into the order of the rows that are not placed
+        anchors = []
+        placed = 0
+        for rows, index in runs:
+            anchors.append(index - 1 - placed)
+            placed += len(rows)
+        keys, last_key = self.keys_at({anchor + step for anchor in anchors for step in (0, 1)
+                                       if anchor + step >= 0}, app_ids)
+        slots = []
+        for (rows, index), anchor in zip(runs, anchors):
+            low = keys.get(anchor, last_key if anchor >= 0 else None)
+            high = keys.get(anchor + 1)
+            slots.append((rows, low[0] if low else None, high[0] if high else None))
+        while any(OrderIndex.spread(low, high, len(rows)) is None for rows, low, high in slots):
+            self.db_spread_positions()
+            slots = [(rows, low * 2, high * 2) if low is not None and high is not None else (rows, low, high)
+                     for rows, low, high in slots]
+        for rows, low, high in slots:
+            self.fill_slot(rows, low, high)
+
+    def fill_slot(self, app_ids, low, high):
+        ranks = OrderIndex.spread(low, high, len(app_ids))
+        while ranks is None:
+            self.db_spread_positions()
+            low, high = low * 2, high * 2
+            ranks = OrderIndex.spread(low, high, len(app_ids))
+        for app_id, rank in zip(app_ids, ranks):
+            self.original_order.remove(app_id)
+            self.original_order.append(app_id, rank)
+        self.mark_positions_changed(app_ids)
+
+    def end_rank(self):
+        # Until every page is loaded the last row in memory is not the last row of the order
+        last_rank = self.conn.execute("SELECT MAX(position) FROM applications").fetchone()[0] or 0
+        if len(self.original_order):
+            last_rank = max(last_rank, self.original_order.rank(self.original_order.at(-1)))
+        return last_rank + OrderIndex.GAP
+
+    def order_index(self, app_id):
+        return self.order_indexes([app_id])[app_id]
+
+    def order_indexes(self, app_ids):
+        if self.fully_loaded:
+            return {app_id: self.original_order.index(app_id) for app_id in app_ids}
+        # One pass over the order: each count only covers the rows since the previous key
+        db_keys, memory_keys = self.pending_keys()
+        indexes = {}
+        count = 0
+        previous = None
+        for key in sorted((self.original_order.rank(app_id), app_id) for app_id in app_ids):
+            if previous is None:
+                count = self.conn.execute(
+                    "SELECT COUNT(*) FROM applications WHERE (position, id) < (?, ?)", key
+                ).fetchone()[0]
+            else:
+                count += self.conn.execute(
+                    "SELECT COUNT(*) FROM applications WHERE (position, id) >= (?, ?) AND (position, id) < (?, ?)",
+                    (*previous, *key)
+                ).fetchone()[0]
+            previous = key
+            indexes[key[1]] = count - bisect.bisect_left(db_keys, key) + bisect.bisect_left(memory_keys, key)
+        return indexes
+
+    def pending_keys(self, exclude=()):
+        # Rows with unflushed changes sit at a different place in memory than in the database
+        pending = (self.pending_upserts | self.pending_deletes | self.pending_positions).difference(exclude)
+        memory_keys = sorted((self.original_order.rank(app_id), app_id) for app_id in pending
+                             if app_id in self.original_order)
+        pending.update(exclude)
+        db_keys = []
+        pending = list(pending)
+        for start in range(0, len(pending), 500):
+            chunk = pending[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            db_keys.extend(self.conn.execute(
+                f"SELECT position, id FROM applications WHERE id IN ({placeholders})", chunk))
+        db_keys.sort()
+        return db_keys, memory_keys
+
+    def neighbor_key(self, key, db_keys, memory_keys, reverse=False):
+        pending = {app_id for position, app_id in db_keys}
+        if reverse:
+            query = ("SELECT position, id FROM applications WHERE (position, id) < (?, ?) "
+                     "ORDER BY position DESC, id DESC")
+            index = bisect.bisect_left(memory_keys, key)
+            memory_key = memory_keys[index - 1] if index else None
+        else:
+            query = "SELECT position, id FROM applications WHERE (position, id) > (?, ?) ORDER BY position, id"
+            index = bisect.bisect_right(memory_keys, key)
+            memory_key = memory_keys[index] if index < len(memory_keys) else None
+        db_key = next((row for row in self.conn.execute(query, key) if row[1] not in pending), None)
+        keys = [found for found in (db_key, memory_key) if found is not None]
+        if not keys:
+            return None
+        return max(keys) if reverse else min(keys)
+
+    def keys_at(self, indexes, exclude):
+        # Keys at the given indexes of the order without the excluded rows, read in one pass
+        db_keys, memory_keys = self.pending_keys(exclude=exclude)
+        pending = {app_id for position, app_id in db_keys}
+        rows = (row for row in self.conn.execute("SELECT position, id FROM applications ORDER BY position, id")
+                if row[1] not in pending)
+        keys = {}
+        key = None
+        stop = max(indexes, default=-1)
+        for index, key in enumerate(heapq.merge(rows, memory_keys)):
+            if index in indexes:
+                keys[index] = key
+            if index >= stop:
+                break
+        return keys, key
+
+    def db_spread_positions(self):
+        with self.conn:
+            self.conn.execute("UPDATE applications SET position = position * 2")
+            log_reload(self.conn, self.writer)
+            end = last_change(self.conn)
+        self.own_changes.append((end - 1, end))
+        self.original_order.scale(2)
+        if self.page_key is not None:
+            self.page_key = (self.page_key[0] * 2, self.page_key[1])
+
+    def journal(self, label, undo_op, redo_op):
+        if self.journal_replay is not None:
+            return
+        self.journal_label = self.journal_label or label
+        self.journal_undo.insert(0, undo_op)
+        self.journal_redo.append(redo_op)
+
+    def db_write_journal(self):
+        if self.journal_replay is not None:
+            seq, undone = self.journal_replay
+            self.conn.execute("UPDATE journal SET undone = ? WHERE seq = ?", (undone, seq))
+        elif self.journal_undo:
+            self.conn.execute("DELETE FROM journal WHERE undone = 1 AND station = ?", (self.station,))
+            self.conn.execute(
+                "INSERT INTO journal (label, undo, redo, station) VALUES (?, ?, ?, ?)",
+                (self.journal_label, json.dumps(self.journal_undo), json.dumps(self.journal_redo), self.station)
+            )
+            self.conn.execute(
+                "DELETE FROM journal WHERE station = ? AND seq NOT IN "
+                "(SELECT seq FROM journal WHERE station = ? ORDER BY seq DESC LIMIT ?)",
+                (self.station, self.station, self.journal_limit)
+            )
+            backup_needed = self.conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM journal WHERE undo = ?)", (UNDO_SWAP,)
+            ).fetchone()[0]
+            if not backup_needed:
+                self.conn.execute("DROP TABLE IF EXISTS applications_undo")
+
+        self.journal_label = None
+        self.journal_undo = []
+        self.journal_redo = []
+        self.journal_replay = None
+
+    def undo(self):
+        self.replay_journal(undone=0)
+
+    def redo(self):
+        self.replay_journal(undone=1)
+
+    def replay_journal(self, undone):
+        if not self.db_flush():
+            return
+        row = self.conn.execute(
+            f"SELECT seq, label, {'undo, redo' if undone == 0 else 'redo, undo'} FROM journal "
+            f"WHERE undone = ? AND station = ? ORDER BY seq {'DESC' if undone == 0 else 'ASC'} LIMIT 1",
+            (undone, self.station)
+        ).fetchone()
+        if row is None:
+            messagebox.showinfo("Info", "Nothing to undo" if undone == 0 else "Nothing to redo")
+            return
+
+        seq, label, ops, done_ops = row
+        conflicts = set()
+        if ops == UNDO_SWAP:
+            try:
+                swapped = self.db_swap_backup(seq, 1 - undone)
+            except sqlite3.OperationalError as e:
+                if not is_busy(e):
+                    raise
+                messagebox.showwarning("Database Busy", "Another station is writing to the database, "
+                                                        "try again in a moment.")
+                return
+            if swapped:
+                self.db_reload()
+            else:
+                messagebox.showwarning(
+                    "Conflict",
+                    f"\"{label}\" can no longer be {'undone' if undone == 0 else 'redone'}: "
+                    f"other stations have changed applications since."
                 )
-            """)
-            conn.commit()
+        else:
+            ops = json.loads(ops)
+            app_ids = {op[1] for op in ops}
+            self.reload_rows(app_ids)
+            if not self.fully_loaded:
+                self.load_records(app_ids)
+
+            # Rows must still look the way this entry left them, otherwise another station changed them since
+            expected = {}
+            for op in json.loads(done_ops):
+                if op[0] in ("insert", "update"):
+                    expected[op[1]] = tuple(op[2:5])
+                elif op[0] == "delete":
+                    expected[op[1]] = None
+            for app_id in app_ids:
+                current = self.applications.get(app_id)
+                if app_id in expected:
+                    if current != expected[app_id]:
+                        conflicts.add(app_id)
+                elif current is None:
+                    conflicts.add(app_id)
+
+            self.journal_replay = seq, 1 - undone
+            try:
+                self.apply_journal_ops([op for op in ops if op[1] not in conflicts])
+                if not self.db_flush(quiet=True):
+                    self.pending_upserts.clear()
+                    self.pending_deletes.clear()
+                    self.pending_positions.clear()
+                    self.reload_rows(app_ids)
+                    conflicts = set()
+                    messagebox.showwarning("Database Busy", "Another station is writing to the database, "
+                                                            "try again in a moment.")
+            finally:
+                self.journal_label = None
+                self.journal_undo = []
+                self.journal_redo = []
+                self.journal_replay = None
+        self.refresh_display()
+        if conflicts:
+            messagebox.showwarning(
+                "Conflict",
+                f"{len(conflicts)} application(s) were changed at another station since \"{label}\". "
+                f"They were left as they are now."
+            )
 
-    def db_save_all(self):
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM applications")
-            for app_id in self.original_order:
-                if app_id in self.applications:
-                    event, applicant, seats = self.applications[app_id]
-                    cursor.execute(
-                        "INSERT INTO applications VALUES (?, ?, ?, ?)",
-                        (app_id, event, applicant, seats)
+    def apply_journal_ops(self, ops):
+        placements = []
+        for op in ops:
+            kind, app_id = op[0], op[1]
+            if kind == "place":
+                # Rows moved together are put back together
+                placements.append((app_id, op[2]))
+                continue
+            if placements:
+                self.place_rows(placements)
+                placements = []
+            if kind == "insert":
+                self.add_record(app_id, tuple(op[2:5]), None if self.fully_loaded else self.end_rank())
+                self.mark_dirty(app_id)
+                if op[5] is not None:
+                    self.place_rows([(app_id, op[5])])
+            elif kind == "delete":
+                self.remove_record(app_id)
+                self.mark_deleted(app_id)
+            elif kind == "update":
+                self.update_record(app_id, tuple(op[2:5]))
+                self.mark_dirty(app_id)
+            elif kind == "move":
+                self.place_rows([(app_id, op[2])])
+        if placements:
+            self.place_rows(placements)
+
+    def db_swap_backup(self, seq, undone):
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            change_seq = self.conn.execute("SELECT change_seq FROM journal WHERE seq = ?", (seq,)).fetchone()[0]
+            if changed_elsewhere(self.conn, change_seq, self.writer):
+                self.conn.execute("DELETE FROM journal WHERE seq = ?", (seq,))
+                self.conn.execute("DROP TABLE IF EXISTS applications_undo")
+                return False
+            version = next_version(self.conn)
+            self.conn.execute("CREATE TEMP TABLE applications_swap AS SELECT * FROM applications")
+            self.conn.execute("DELETE FROM applications")
+            self.conn.execute("INSERT INTO applications SELECT * FROM applications_undo")
+            self.conn.execute("DELETE FROM applications_undo")
+            self.conn.execute("INSERT INTO applications_undo SELECT * FROM temp.applications_swap")
+            self.conn.execute("DROP TABLE temp.applications_swap")
+            self.conn.execute("UPDATE applications SET version = ?", (version,))
+            rebuild_search_index(self.conn)
+            log_reload(self.conn, self.writer)
+            self.conn.execute("UPDATE journal SET undone = ?, change_seq = ? WHERE seq = ?",
+                              (undone, last_change(self.conn), seq))
+        self.schedule_snapshot()
+        return True
+
+    def db_flush(self, quiet=False):
+        if not (self.pending_upserts or self.pending_deletes or self.pending_positions
+                or self.journal_replay is not None):
+            return True
+
+        conflicts = set()
+        versions = {}
+        journal_state = self.journal_label, self.journal_undo, self.journal_redo, self.journal_replay
+        own_changes = None
+        stats_changes = None
+        touched = self.pending_deletes | self.pending_upserts
+        try:
+            with self.conn:
+                if self.sql_view:
+                    old_rows = self.stats.read(self.conn, touched)
+                if self.fts_enabled:
+                    self.conn.executemany(
+                        """
+                        INSERT INTO applications_fts (applications_fts, rowid, event, applicant)
+                        SELECT 'delete', id, event, applicant FROM applications WHERE id = ?
+                        """,
+                        [(app_id,) for app_id in self.pending_deletes | self.pending_upserts]
+                    )
+                for app_id in self.pending_deletes:
+                    version = self.applications.version(app_id)
+                    if version and not self.conn.execute(
+                            "DELETE FROM applications WHERE id = ? AND version = ?", (app_id, version)).rowcount:
+                        conflicts.add(app_id)
+                for app_id in self.pending_upserts:
+                    version = self.applications.version(app_id)
+                    row = (*self.applications[app_id], self.original_order.rank(app_id))
+                    if version:
+                        cursor = self.conn.execute(
+                            """
+                            UPDATE applications SET event = ?, applicant = ?, seats = ?, position = ?,
+                                version = version + 1
+                            WHERE id = ? AND version = ?
+                            """,
+                            (*row, app_id, version)
+                        )
+                    else:
+                        cursor = self.conn.execute(
+                            """
+                            INSERT INTO applications (id, event, applicant, seats, position) VALUES (?, ?, ?, ?, ?)
+                            ON CONFLICT(id) DO NOTHING
+                            """,
+                            (app_id, *row)
+                        )
+                    if cursor.rowcount:
+                        versions[app_id] = version + 1
+                    else:
+                        conflicts.add(app_id)
+                self.conn.executemany(
+                    "UPDATE applications SET position = ? WHERE id = ?",
+                    [(self.original_order.rank(app_id), app_id) for app_id in self.pending_positions
+                     if app_id not in self.pending_upserts and app_id in self.original_order]
+                )
+                if self.fts_enabled:
+                    self.conn.executemany(
+                        """
+                        INSERT INTO applications_fts (rowid, event, applicant)
+                        SELECT id, event, applicant FROM applications WHERE id = ?
+                        """,
+                        [(app_id,) for app_id in self.pending_upserts | conflicts]
                     )
-            conn.commit()
 
-    def db_load_all(self):
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM applications ORDER BY id")
-            rows = cursor.fetchall()
+                if self.sql_view:
+                    stats_changes = self.stats.changes(self.conn, old_rows, self.stats.read(self.conn, touched))
+                written = (self.pending_upserts | self.pending_deletes | self.pending_positions) - conflicts
+                if written:
+                    end = log_changes(self.conn, sorted(written), self.writer)
+                    own_changes = (end - len(written), end)
+                if conflicts and self.journal_replay is None:
+                    self.journal_undo = []
+                self.db_write_journal()
+        except sqlite3.OperationalError as e:
+            if not is_busy(e):
+                raise
+            # Nothing was written, keep everything pending and try again once the other writer is done
+            self.journal_label, self.journal_undo, self.journal_redo, self.journal_replay = journal_state
+            if self.flush_job is None:
+                self.flush_job = self.root.after(self.flush_delay, self.retry_flush)
+            if not quiet:
+                messagebox.showwarning(
+                    "Database Busy",
+                    "Another station is writing to the database. Unsaved changes are kept and will be "
+                    "saved automatically, try again in a moment."
+                )
+            return False
 
-        self.applications = {}
-        self.original_order = []
-        self.next_id = 1
+        if own_changes is not None:
+            self.own_changes.append(own_changes)
+        for app_id, version in versions.items():
+            self.applications.set_version(app_id, version)
+
+        if self.profiler.enabled:
+            self.profiler.count("rows_written", len(self.pending_upserts) + len(self.pending_deletes)
+                                + len(self.pending_positions))
+        self.pending_upserts.clear()
+        self.pending_deletes.clear()
+        self.pending_positions.clear()
+        if conflicts:
+            self.reload_rows(conflicts)
+        if stats_changes is not None:
+            self.stats.apply(stats_changes)
+            self.stats_flushes += 1
+        self.schedule_snapshot()
+        if conflicts:
+            self.refresh_display()
+            messagebox.showwarning(
+                "Conflict",
+                f"{len(conflicts)} application(s) were changed at another station. "
+                f"Your changes to them were discarded and their current data was loaded."
+            )
+        return True
+
+    def refresh_stats(self):
+        # Whole-table aggregates take seconds on big databases, so they are counted off the UI thread
+        if self.stats_job is not None:
+            self.stats_job.cancel()
+        self.stats_job = DatabaseStatsJob(self.db_file, self.busy_timeout)
+        self.stats_job_flushes = self.stats_flushes
+        self.profiler.watch(self.stats_job)
+        self.stats_job.start()
+        self.root.after(100, self.poll_stats, self.stats_job)
+
+    def poll_stats(self, job):
+        if job is not self.stats_job:
+            return
+        try:
+            kind, data = job.events.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self.poll_stats, job)
+            return
 
+        self.stats_job = None
+        if kind != "done":
+            return
+        if self.stats_job_flushes != self.stats_flushes:
+            # A flush was counted into the old totals while this ran and may be missing from the new ones
+            self.refresh_stats()
+            return
+        data.version = self.stats.version + 1
+        self.stats = self.event_summary = data
+        self.update_statistics()
+
+    def retry_flush(self):
+        self.flush_job = None
+        self.db_flush(quiet=True)
+
+    def db_save_all(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM applications")
+            self.conn.executemany(
+                "INSERT INTO applications (id, event, applicant, seats, position, version) VALUES (?, ?, ?, ?, ?, 1)",
+                [(app_id, *self.applications[app_id], self.original_order.rank(app_id))
+                 for app_id in self.original_order if app_id in self.applications]
+            )
+            rebuild_search_index(self.conn)
+            log_reload(self.conn, self.writer)
+            end = last_change(self.conn)
+            self.own_changes.append((end - 1, end))
+
+        for app_id in self.original_order:
+            self.applications.set_version(app_id, 1)
+
+        self.pending_upserts.clear()
+        self.pending_deletes.clear()
+        self.pending_positions.clear()
+        if self.sql_view:
+            self.refresh_stats()
+        self.schedule_snapshot()
+
+    def db_load_all(self):
+        if self.load_job is not None:
+            self.root.after_cancel(self.load_job)
+            self.load_job = None
+        self.fully_loaded = True
+
+        rows = self.conn.execute(
+            "SELECT id, event, applicant, seats, position, version FROM applications ORDER BY position, id"
+        ).fetchall()
+
+        self.pending_upserts.clear()
+        self.pending_deletes.clear()
+        self.pending_positions.clear()
+        self.clear_records()
+
+        last_position = None
+        needs_rebalance = False
         for row in rows:
-            app_id, event, applicant, seats = row
-            self.applications[app_id] = (event, applicant, seats)
-            self.original_order.append(app_id)
-            if app_id >= self.next_id:
-                self.next_id = app_id + 1
+            app_id, event, applicant, seats, position, version = row
+            if position is None or (last_position is not None and position <= last_position):
+                needs_rebalance = True
+                position = None
+            self.add_record(app_id, (event, applicant, seats), position, version)
+            last_position = self.original_order.rank(app_id)
+
+        if needs_rebalance:
+            self.mark_positions_changed(self.original_order.rebalance())
+
+    def db_start_paging(self):
+        self.pending_upserts.clear()
+        self.pending_deletes.clear()
+        self.pending_positions.clear()
+        self.clear_records()
+        self.next_id = (self.conn.execute("SELECT MAX(id) FROM applications").fetchone()[0] or 0) + 1
+        self.load_total = self.conn.execute("SELECT COUNT(*) FROM applications").fetchone()[0]
+        self.page_key = None
+        self.fully_loaded = False
+        if self.db_load_page() is not None and not self.fully_loaded and not self.sql_view:
+            self.load_job = self.root.after_idle(self.load_next_page)
+
+    def db_load_page(self):
+        if self.page_key is None:
+            rows = self.conn.execute(
+                "SELECT id, event, applicant, seats, position, version FROM applications "
+                "ORDER BY position, id LIMIT ?",
+                (self.page_size,)
+            ).fetchall()
+        else:
+            rows = self.conn.execute(
+                "SELECT id, event, applicant, seats, position, version FROM applications "
+                "WHERE (position, id) > (?, ?) ORDER BY position, id LIMIT ?",
+                (*self.page_key, self.page_size)
+            ).fetchall()
+
+        page = []
+        for app_id, event, applicant, seats, position, version in rows:
+            if position is None or (self.page_key is not None and position <= self.page_key[0]):
+                self.db_load_all()
+                self.db_flush()
+                return None
+            self.page_key = (position, app_id)
+            if app_id in self.applications:
+                continue
+            self.add_record(app_id, (event, applicant, seats), position, version)
+            page.append(app_id)
+
+        if len(rows) < self.page_size:
+            self.fully_loaded = True
+        return page
+
+    def load_next_page(self):
+        self.load_job = None
+        if self.fully_loaded:
+            return
+
+        page = self.db_load_page()
+        if page is None or self.fully_loaded:
+            self.refresh_display()
+            return
+
+        self.update_statistics()
+        self.load_job = self.root.after_idle(self.load_next_page)
+
+    def db_reload(self):
+        self.change_seq = last_change(self.conn)
+        self.own_changes = []
+        if self.lazy_load:
+            self.db_start_paging()
+        else:
+            self.db_load_all()
+            self.db_flush()
+        if self.sql_view:
+            self.refresh_stats()
+
+    def load_record(self, app_id):
+        if app_id in self.applications:
+            return
+        event, applicant, seats, position, version = self.conn.execute(
+            "SELECT event, applicant, seats, position, version FROM applications WHERE id = ?", (app_id,)
+        ).fetchone()
+        self.add_record(app_id, (event, applicant, seats), position, version)
+        self.row_cache.pop(app_id, None)
+
+    def load_records(self, app_ids):
+        missing = [app_id for app_id in app_ids if app_id not in self.applications]
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            for app_id, event, applicant, seats, position, version in self.conn.execute(
+                    f"SELECT id, event, applicant, seats, position, version FROM applications "
+                    f"WHERE id IN ({placeholders})", chunk):
+                self.add_record(app_id, (event, applicant, seats), position, version)
+                self.row_cache.pop(app_id, None)
+
+    def reload_rows(self, app_ids):
+        app_ids = list(app_ids)
+        found = {}
+        for start in range(0, len(app_ids), 500):
+            chunk = app_ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            for app_id, *row in self.conn.execute(
+                    f"SELECT id, event, applicant, seats, position, version FROM applications "
+                    f"WHERE id IN ({placeholders})", chunk):
+                found[app_id] = row
+
+        for app_id in app_ids:
+            self.row_cache.pop(app_id, None)
+            loaded = app_id in self.applications
+            row = found.get(app_id)
+            if row is None:
+                if loaded:
+                    self.remove_record(app_id)
+                continue
+
+            event, applicant, seats, position, version = row
+            if not loaded and self.sql_view:
+                continue
+            if not (self.sql_view or self.fully_loaded) and (self.page_key is None
+                                                            or (position, app_id) > self.page_key):
+                if loaded:
+                    self.remove_record(app_id)
+                continue
+
+            if not loaded:
+                self.add_record(app_id, (event, applicant, seats), position, version)
+                continue
+            if self.applications[app_id] != (event, applicant, seats):
+                self.update_record(app_id, (event, applicant, seats))
+            if self.original_order.rank(app_id) != position:
+                self.original_order.remove(app_id)
+                self.original_order.append(app_id, position)
+            self.applications.set_version(app_id, version)
+
+    def poll_changes(self):
+        self.sync_job = self.root.after(self.sync_delay, self.poll_changes)
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self.data_version or self.dragging_item is not None:
+            return
+
+        self.data_version = data_version
+        rows, missed = read_changes(self.conn, self.change_seq)
+        if not rows:
+            return
+
+        since, self.change_seq = self.change_seq, rows[-1][0]
+        own_changes, self.own_changes = self.own_changes, []
+        reload_all = missed
+        app_ids = set()
+        for seq, app_id in rows:
+            if any(start < seq <= end for start, end in own_changes):
+                continue
+            if app_id is None:
+                reload_all = True
+            else:
+                app_ids.add(app_id)
+        if not (reload_all or app_ids):
+            return
+
+        if not self.db_flush(quiet=True):
+            self.change_seq = since
+            self.own_changes = own_changes + self.own_changes
+            self.data_version = None
+            return
+        if reload_all:
+            self.db_reload()
+        else:
+            self.reload_rows(app_ids)
+            if self.sql_view:
+                self.refresh_stats()
+        self.refresh_display()
+
+    def fetch_rows(self, app_ids):
+        app_ids = list(app_ids)
+        for start in range(0, len(app_ids), 500):
+            chunk = app_ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            for app_id, event, applicant, seats in self.conn.execute(
+                    f"SELECT id, event, applicant, seats FROM applications WHERE id IN ({placeholders})", chunk):
+                self.row_cache[app_id] = (event, applicant, seats)
+        if self.profiler.enabled:
+            self.profiler.count("rows_fetched", len(app_ids))
 
     def csv_export(self):
         file_path = filedialog.asksaveasfilename(
@@ -255,19 +1203,25 @@ class ApplicationManager:
         if not file_path:
             return
 
-        data_to_export = []
-        for app_id in self.original_order:
-            if app_id in self.applications:
-                data_to_export.append(self.applications[app_id])
+        if self.view_is_narrowed() and messagebox.askyesno(
+                "Export", "Export only the applications in the current view (search, filter and sort)?"):
+            query, params = build_view_query("event, applicant, seats", self.current_search, self.current_filter,
+                                             self.sort_column, self.sort_reverse, self.fts_enabled)
+        else:
+            query, params = build_view_query("event, applicant, seats")
 
-        try:
-            with open(file_path, "w", newline="", encoding="utf-8") as file:
-                writer = csv.writer(file)
-                writer.writerow(["Event name", "Applicant", "Seats number"])
-                writer.writerows(data_to_export)
-            messagebox.showinfo("Success", "Data exported successfully")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export data: {str(e)}")
+        if not self.db_flush():
+            return
+
+        def finish(kind, data):
+            if kind == "done":
+                messagebox.showinfo("Success", f"Data exported successfully: {data} applications")
+            elif kind == "cancelled":
+                messagebox.showinfo("Info", "Export cancelled")
+            else:
+                messagebox.showerror("Error", f"Failed to export data: {data}")
+
+        self.run_with_progress(CsvExporter(self.db_file, file_path, query, params), "Exporting CSV", finish)
 
     def csv_import(self):
         file_path = filedialog.askopenfilename(
@@ -279,56 +1233,131 @@ class ApplicationManager:
         if not file_path:
             return
 
-        try:
-            with open(file_path, "r", newline="", encoding="utf-8") as file:
-                reader = csv.reader(file)
-                next(reader)
-                imported_data = [row for row in reader if len(row) == 3]
+        if not self.db_flush():
+            return
 
-            if not imported_data:
+        def finish(kind, data):
+            if kind == "done":
+                accepted, rejected, duplicates = data
+                self.db_reload()
+                self.schedule_snapshot()
+                self.refresh_display()
+                messagebox.showinfo("Success", f"Data imported successfully: {accepted} applications, "
+                                               f"{rejected} rows rejected, {duplicates} duplicates")
+            elif kind == "empty":
                 messagebox.showinfo("Info", "No valid data found in the CSV file")
-                return
+            elif kind == "cancelled":
+                messagebox.showinfo("Info", "Import cancelled, existing data was kept")
+            else:
+                messagebox.showerror("Error", f"Failed to import data: {data}")
 
-            self.applications = {}
-            self.original_order = []
-            self.next_id = 1
-            self.highlighted_items = set()
+        job = CsvImporter(self.db_file, file_path, self.dedupe_policy, station=self.station, writer=self.writer)
+        self.run_with_progress(job, "Importing CSV", finish)
 
-            for row in imported_data:
-                try:
-                    event, applicant = row[0], row[1]
-                    seats = int(row[2])
-                    if seats < 1:
-                        raise ValueError("Seats must be positive")
-                    elif not event or not applicant:
-                        raise ValueError("Event and applicant names cannot be empty")
-
-                    self.applications[self.next_id] = (event, applicant, seats)
-                    self.original_order.append(self.next_id)
-                    self.next_id += 1
-                except (ValueError, IndexError):
-                    continue
-
-            self.save_data_to_file()
-            self.db_save_all()
-            self.refresh_display()
-            messagebox.showinfo("Success", "Data imported successfully")
+    def dedupe_dialog(self):
+        dialog = tk.Toplevel(self.root)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        dialog.title("Duplicate Applications")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to import data: {str(e)}")
+        tk.Label(dialog, text="Applications with the same event and applicant\n"
+                              "(ignoring case and extra spaces) are duplicates.").pack(pady=10, padx=10)
+
+        policy_var = tk.StringVar(value=self.dedupe_policy or "skip")
+        policy_frame = tk.Frame(dialog)
+        policy_frame.pack(pady=5, padx=10)
+        for policy, text in zip(DEDUPE_POLICIES, ["Keep the first application",
+                                                   "Keep the first application, add up the seats",
+                                                   "Keep the first position, take the last values"]):
+            tk.Radiobutton(policy_frame, text=text, variable=policy_var, value=policy).pack(anchor="w")
+
+        on_import = tk.BooleanVar(value=self.dedupe_policy is not None)
+        tk.Checkbutton(dialog, text="Remove duplicates when importing CSV", variable=on_import).pack(pady=5)
+
+        def save():
+            self.dedupe_policy = policy_var.get() if on_import.get() else None
+            dialog.destroy()
+
+        def remove_now():
+            save()
+            self.remove_duplicates(policy_var.get())
+
+        button_frame = tk.Frame(dialog)
+        button_frame.pack(pady=10)
+        tk.Button(button_frame, text="Remove Now", width=12, command=remove_now).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Save", width=10, command=save).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Cancel", width=10, command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+
+    def remove_duplicates(self, policy):
+        if not self.db_flush():
+            return
+
+        def finish(kind, data):
+            if kind == "done":
+                if data:
+                    self.db_reload()
+                    self.schedule_snapshot()
+                    self.refresh_display()
+                messagebox.showinfo("Success", f"Duplicates removed: {data}")
+            elif kind == "cancelled":
+                messagebox.showinfo("Info", "Duplicate removal cancelled, existing data was kept")
+            else:
+                messagebox.showerror("Error", f"Failed to remove duplicates: {data}")
+
+        job = DedupeJob(self.db_file, policy, station=self.station, writer=self.writer)
+        self.run_with_progress(job, "Removing Duplicates", finish)
+
+    def view_is_narrowed(self):
+        return bool(self.current_search) or self.current_filter != "All" or self.sort_column is not None
+
+    def run_with_progress(self, job, title, on_finish):
+        dialog = tk.Toplevel(self.root)
+        dialog.title(title)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        dialog.protocol("WM_DELETE_WINDOW", job.cancel)
+
+        progress = ttk.Progressbar(dialog, length=300, maximum=100, mode="determinate")
+        progress.pack(padx=10, pady=10)
+        status_var = tk.StringVar(value="Starting...")
+        tk.Label(dialog, textvariable=status_var).pack(padx=10)
+        tk.Button(dialog, text="Cancel", width=10, command=job.cancel).pack(pady=10)
+
+        self.profiler.watch(job)
+        job.start()
+        self.root.after(100, self.poll_job, job, dialog, progress, status_var, on_finish)
+
+    def poll_job(self, job, dialog, progress, status_var, on_finish):
+        while True:
+            try:
+                kind, data = job.events.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                fraction, text = data
+                progress["value"] = fraction * 100
+                status_var.set(text)
+                continue
+
+            dialog.destroy()
+            on_finish(kind, data)
+            return
+
+        self.root.after(100, self.poll_job, job, dialog, progress, status_var, on_finish)
 
     def load_data_from_file(self):
+        has_rows = self.conn.execute("SELECT EXISTS (SELECT 1 FROM applications)").fetchone()[0]
+        if has_rows or not os.path.exists(self.data_file):
+            self.db_reload()
+            return
+
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    for app in data:
-                        if self.validate_application_data(app):
-                            self.applications[self.next_id] = (app[0], app[1], int(app[2]))
-                            self.original_order.append(self.next_id)
-                            self.next_id += 1
-            else:
-                self.db_load_all()
+            with open(self.data_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                for app in data:
+                    if self.validate_application_data(app):
+                        self.add_record(self.next_id, (app[0], app[1], int(app[2])))
         except (json.JSONDecodeError, IOError):
             default_data = [
                 ("Python Conference", "Ivanov I.I.", 3),
@@ -342,18 +1371,28 @@ class ApplicationManager:
                 ("Machine Learning Course", "Tkachenko T.T.", 1),
                 ("Experts Meeting", "Savchenko S.S.", 2)
             ]
+            self.clear_records()
             for app in default_data:
-                self.applications[self.next_id] = app
-                self.original_order.append(self.next_id)
-                self.next_id += 1
+                self.add_record(self.next_id, app)
+        self.db_save_all()
+        if self.sql_view:
+            self.refresh_stats()
 
-    def save_data_to_file(self):
-        try:
-            data_to_save = [self.applications[app_id] for app_id in self.original_order]
-            with open(self.data_file, "w", encoding="utf-8") as f:
-                json.dump(data_to_save, f, ensure_ascii=False, indent=2)
-        except IOError as e:
-            messagebox.showerror("Error", f"Failed to save data: {str(e)}")
+    def schedule_snapshot(self):
+        if not self.json_snapshot:
+            return
+        if self.snapshot_job is not None:
+            self.root.after_cancel(self.snapshot_job)
+        self.snapshot_job = self.root.after(self.snapshot_delay, self.write_snapshot)
+
+    def write_snapshot(self):
+        self.snapshot_job = None
+        if self.snapshot_writer is not None and self.snapshot_writer.thread.is_alive():
+            self.schedule_snapshot()
+            return
+        self.snapshot_writer = JsonSnapshot(self.db_file, self.data_file)
+        self.profiler.watch(self.snapshot_writer)
+        self.snapshot_writer.start()
 
     def setup_ui(self):
         self.setup_toolbar()
@@ -363,6 +1402,11 @@ class ApplicationManager:
         self.setup_context_menu()
         self.refresh_display()
 
+        for sequence, command in [("<Control-z>", self.undo), ("<Control-Z>", self.undo),
+                                  ("<Control-y>", self.redo), ("<Control-Y>", self.redo)]:
+            self.root.bind(sequence, lambda e, c=command: None if isinstance(e.widget, tk.Entry) else c())
+        self.root.bind("<F12>", lambda e: self.toggle_performance_panel())
+
     def setup_toolbar(self):
         toolbar = tk.Frame(self.root)
         toolbar.pack(fill=tk.X, padx=5, pady=5)
@@ -371,13 +1415,19 @@ class ApplicationManager:
             ("Add", self.add_application),
             ("Delete", self.delete_application),
             ("Edit", self.edit_application),
+            ("Set Seats", self.edit_seats),
             ("Highlight", self.highlight_selected),
             ("Clear Highlight", self.clear_highlight),
             ("Export CSV", self.csv_export),
             ("Import CSV", self.csv_import),
+            ("Duplicates", self.dedupe_dialog),
             ("Export PDF", self.export_to_pdf),
+            ("Events", self.show_event_summary),
+            ("Performance", self.toggle_performance_panel),
             ("Email Setup", self.setup_email_dialog),
-            ("Sync DB", self.db_save_all)
+            ("Undo", self.undo),
+            ("Redo", self.redo),
+            ("Sync DB", self.db_flush)
         ]
 
         for text, command in buttons:
@@ -391,7 +1441,7 @@ class ApplicationManager:
         self.search_var = tk.StringVar()
         self.search_entry = tk.Entry(search_frame, textvariable=self.search_var)
         self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
-        self.search_entry.bind("<KeyRelease>", lambda e: self.apply_filters())
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
 
         tk.Label(search_frame, text="Filter by seats:").pack(side=tk.LEFT, padx=(10, 0))
         self.filter_var = tk.StringVar(value="All")
@@ -407,7 +1457,7 @@ class ApplicationManager:
             self.tree_frame,
             columns=("event", "applicant", "seats"),
             show="headings",
-            selectmode="browse"
+            selectmode="extended"
         )
 
         columns = {
@@ -420,14 +1470,16 @@ class ApplicationManager:
             self.treeview.heading(col, text=text, command=lambda c=col: self.sort_by_column(c))
             self.treeview.column(col, width=width, anchor="w" if col != "seats" else "center")
 
-        scrollbar = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.treeview.yview)
-        self.treeview.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.on_scrollbar)
+        self.treeview.configure(yscrollcommand=self.on_tree_yscroll)
         self.treeview.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         self.treeview.tag_configure('highlight', background='#e6f3ff')
+        self.row_height = int(ttk.Style().lookup("Treeview", "rowheight") or self.row_height)
 
         self.treeview.bind("<Double-1>", lambda e: self.edit_application())
+        self.treeview.bind("<Configure>", self.on_tree_configure)
         self.treeview.bind("<Button-3>", self.show_context_menu)
         self.treeview.bind("<ButtonPress-1>", self.on_drag_start)
         self.treeview.bind("<B1-Motion>", self.on_drag_motion)
@@ -436,19 +1488,23 @@ class ApplicationManager:
         self.treeview.bind("<KeyPress-Page_Down>", lambda e: self.on_key_move("down"))
         self.treeview.bind("<KeyPress-Home>", lambda e: self.on_key_move("home"))
         self.treeview.bind("<KeyPress-End>", lambda e: self.on_key_move("end"))
+        self.treeview.bind("<Control-a>", self.select_all)
+        self.treeview.bind("<KeyPress-Up>", self.on_plain_select)
+        self.treeview.bind("<KeyPress-Down>", self.on_plain_select)
 
     def setup_context_menu(self):
         self.context_menu = tk.Menu(self.root, tearoff=0)
         self.context_menu.add_command(label="Add", command=self.add_application)
         self.context_menu.add_command(label="Edit", command=self.edit_application)
         self.context_menu.add_command(label="Delete", command=self.delete_application)
+        self.context_menu.add_command(label="Set Seats...", command=self.edit_seats)
         self.context_menu.add_separator()
         self.context_menu.add_command(label="Highlight", command=self.highlight_selected)
         self.context_menu.add_command(label="Clear Highlight", command=self.clear_highlight)
         self.context_menu.add_separator()
         self.context_menu.add_command(label="Export to CSV", command=self.csv_export)
         self.context_menu.add_command(label="Import from CSV", command=self.csv_import)
-        self.context_menu.add_command(label="Sync with Database", command=self.db_save_all)
+        self.context_menu.add_command(label="Sync with Database", command=self.db_flush)
 
     def validate_application_data(self, app_data):
         if len(app_data) != 3:
@@ -457,44 +1513,232 @@ class ApplicationManager:
         event, applicant, seats = app_data
         return (isinstance(event, str) and bool(event.strip()) and
                 isinstance(applicant, str) and bool(applicant.strip()) and
-                isinstance(seats, int) and seats >= 1)
+                isinstance(seats, int) and 1 <= seats <= ApplicationStore.MAX_SEATS)
 
     def refresh_display(self):
-        self.treeview.delete(*self.treeview.get_children())
-
-        filtered_data = []
-        for app_id in self.original_order:
-            if app_id in self.applications:
-                event, applicant, seats = self.applications[app_id]
+        if self.sql_view or not self.fully_loaded:
+            # Until every page is in memory the database answers search, filter and sort
+            self.view_ids = DatabaseView(self.conn, self.current_search, self.current_filter,
+                                         self.sort_column, self.sort_reverse, self.fts_enabled)
+        else:
+            self.view_ids = self.memory_view_ids()
 
-                search_ok = (not self.current_search or
-                             self.current_search in event.lower() or
-                             self.current_search in applicant.lower())
+        self.render_view()
 
-                if self.current_filter == "All":
-                    filter_ok = True
-                elif self.current_filter == "5+":
-                    filter_ok = seats >= 5
-                else:
-                    filter_ok = seats == int(self.current_filter)
+        self.update_column_headers()
+        self.update_statistics()
 
-                if search_ok and filter_ok:
-                    filtered_data.append((app_id, (event, applicant, seats)))
+    def memory_view_ids(self):
+        matches = self.search_cache.search(self.current_search)
+        bucket = self.seat_buckets.ids_for(self.current_filter)
+        if bucket is not None:
+            matches = bucket if matches is None else matches & bucket
+        few_matches = matches is not None and len(matches) * 8 < len(self.applications)
 
         if self.sort_column:
             col_index = ["event", "applicant", "seats"].index(self.sort_column)
-            filtered_data.sort(key=lambda x: x[1][col_index], reverse=self.sort_reverse)
+            if few_matches:
+                candidates = sorted(matches, key=lambda app_id: (self.applications[app_id][col_index], app_id),
+                                    reverse=self.sort_reverse)
+            else:
+                candidates = self.sort_indexes[self.sort_column].ids(self.sort_reverse)
+        elif few_matches:
+            candidates = sorted(matches, key=self.original_order.rank)
+        else:
+            candidates = self.original_order
 
-        for app_id, app_data in filtered_data:
-            tags = ['highlight'] if app_id in self.highlighted_items else []
-            self.treeview.insert("", "end", values=app_data, tags=tags, iid=str(app_id))
+        if matches is None or few_matches:
+            return list(candidates)
+        return [app_id for app_id in candidates if app_id in matches]
 
-        self.update_column_headers()
-        self.update_statistics()
+    def render_view(self):
+        if self.virtual_mode:
+            self.view_offset = max(0, min(self.view_offset, len(self.view_ids) - self.visible_rows))
+            self.render_window()
+        else:
+            self.window_start, self.window_stop = 0, len(self.view_ids)
+            self.render_rows(self.view_ids)
+
+    def render_window(self):
+        self.render_job = None
+        self.window_start = max(0, self.view_offset - self.overscan)
+        self.window_stop = min(len(self.view_ids), self.view_offset + self.visible_rows + self.overscan)
+        window = self.view_ids[self.window_start:self.window_stop]
+        if self.row_cache:
+            self.row_cache = {app_id: self.row_cache[app_id] for app_id in window if app_id in self.row_cache}
+        self.render_rows(window)
+
+        materialized = self.window_stop - self.window_start
+        if materialized:
+            self.treeview.yview_moveto((self.view_offset - self.window_start) / materialized)
+        self.update_scrollbar()
+
+    def render_rows(self, app_ids):
+        missing = [app_id for app_id in app_ids if app_id not in self.applications and app_id not in self.row_cache]
+        if missing:
+            self.fetch_rows(missing)
+
+        self.sync_selection()
+        wanted = [str(app_id) for app_id in app_ids]
+        wanted_set = set(wanted)
+
+        current = self.treeview.get_children()
+        stale = [item for item in current if item not in wanted_set]
+        if stale:
+            self.treeview.delete(*stale)
+            for item in stale:
+                self.rendered.pop(item, None)
+
+        positions = {item: index for index, item in enumerate(wanted)}
+        in_place = longest_increasing_run([item for item in current if item in wanted_set], positions)
+
+        previous = None
+        for app_id, item in zip(app_ids, wanted):
+            row = self.row_state(app_id)
+            if item not in self.rendered:
+                index = self.treeview.index(previous) + 1 if previous else 0
+                self.treeview.insert("", index, iid=item, values=row[0], tags=row[1])
+                if app_id in self.selected:
+                    self.treeview.selection_add(item)
+            else:
+                if item not in in_place:
+                    index = self.treeview.index(previous) + 1 if previous else 0
+                    if previous and self.treeview.index(item) < index:
+                        index -= 1
+                    self.treeview.move(item, "", index)
+                if self.rendered[item] != row:
+                    self.treeview.item(item, values=row[0], tags=row[1])
+            self.rendered[item] = row
+            previous = item
+
+    def sync_selection(self):
+        rendered = {int(item) for item in self.rendered}
+        self.selected = (self.selected - rendered) | {int(item) for item in self.treeview.selection()}
+
+    def selected_ids(self):
+        self.sync_selection()
+        indexes = self.view_positions(self.selected)
+        return sorted(indexes, key=indexes.get)
+
+    def view_positions(self, app_ids):
+        if isinstance(self.view_ids, DatabaseView):
+            return self.view_ids.indexes(app_ids)
+        return {app_id: index for index, app_id in enumerate(self.view_ids) if app_id in app_ids}
+
+    def view_at(self, indexes):
+        if isinstance(self.view_ids, DatabaseView):
+            return self.view_ids.at(indexes)
+        return {index: self.view_ids[index] for index in indexes}
+
+    def select_all(self, event=None):
+        self.selected = set(self.view_ids)
+        self.treeview.selection_set(list(self.rendered))
+        return "break"
+
+    def row_state(self, app_id):
+        tags = ('highlight',) if app_id in self.highlighted_items else ()
+        app = self.applications[app_id] if app_id in self.applications else self.row_cache[app_id]
+        return app, tags
+
+    def update_row(self, app_id):
+        item = str(app_id)
+        if item in self.rendered:
+            row = self.row_state(app_id)
+            if self.rendered[item] != row:
+                self.treeview.item(item, values=row[0], tags=row[1])
+                self.rendered[item] = row
+
+    def update_scrollbar(self):
+        total = len(self.view_ids)
+        if not total:
+            self.scrollbar.set(0, 1)
+            return
+        self.scrollbar.set(self.view_offset / total, min(1, (self.view_offset + self.visible_rows) / total))
+
+    def scroll_to(self, offset):
+        self.view_offset = max(0, min(offset, len(self.view_ids) - self.visible_rows))
+        self.render_window()
+
+    def scroll_into_view(self, index):
+        if index < self.view_offset:
+            self.scroll_to(index)
+        elif index >= self.view_offset + self.visible_rows:
+            self.scroll_to(index - self.visible_rows + 1)
+        else:
+            self.render_window()
+
+    def on_scrollbar(self, *args):
+        if not self.virtual_mode:
+            self.treeview.yview(*args)
+            return
+
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.view_ids)))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_to(self.view_offset + int(args[1]) * step)
+
+    def on_tree_yscroll(self, first, last):
+        if not self.virtual_mode:
+            self.scrollbar.set(first, last)
+            return
+
+        materialized = self.window_stop - self.window_start
+        top = self.window_start + round(float(first) * materialized)
+        if top != self.view_offset:
+            self.view_offset = top
+            margin = self.overscan // 2
+            near_start = self.window_start > 0 and top - self.window_start < margin
+            near_stop = (self.window_stop < len(self.view_ids) and
+                         self.window_stop - (top + self.visible_rows) < margin)
+            if (near_start or near_stop) and self.render_job is None:
+                self.render_job = self.root.after_idle(self.render_window)
+        self.update_scrollbar()
+
+    def on_tree_configure(self, event):
+        visible_rows = max(1, event.height // self.row_height - 1)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render_view()
+
+    def view_index(self, item):
+        return self.window_start + self.treeview.index(item)
+
+    def move_in_view(self, old_index, new_index):
+        if len(self.view_ids) < 2:
+            return
+        # The row the moved one ends up next to, counted in the view before the move
+        neighbor_index = new_index - 1 if new_index > 0 else 0
+        if neighbor_index >= old_index:
+            neighbor_index += 1
+        ids = self.view_at([old_index, neighbor_index])
+        app_id, neighbor = ids[old_index], ids[neighbor_index]
+        if not isinstance(self.view_ids, DatabaseView):
+            self.view_ids.insert(new_index, self.view_ids.pop(old_index))
+
+        if new_index > 0:
+            self.move_blocks([([app_id], neighbor, None)])
+        else:
+            self.move_blocks([([app_id], None, neighbor)])
+
+    def schedule_search(self, event=None):
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(self.search_delay, self.apply_filters)
 
     def apply_filters(self, event=None):
-        self.current_search = self.search_var.get().lower()
-        self.current_filter = self.filter_var.get()
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+            self.search_job = None
+
+        search = self.search_var.get().lower()
+        current_filter = self.filter_var.get()
+        if search == self.current_search and current_filter == self.current_filter:
+            return
+
+        self.current_search = search
+        self.current_filter = current_filter
+        self.view_offset = 0
         self.refresh_display()
 
     def sort_by_column(self, column):
@@ -503,6 +1747,7 @@ class ApplicationManager:
         else:
             self.sort_column = column
             self.sort_reverse = False
+        self.view_offset = 0
         self.refresh_display()
 
     def update_column_headers(self):
@@ -513,9 +1758,18 @@ class ApplicationManager:
                 text = f"{text} {arrow}"
             self.treeview.heading(col, text=text)
 
+    def on_plain_select(self, event):
+        if event.state & (0x0001 | 0x0004):
+            return False
+        self.selected = set()
+        return True
+
     def on_drag_start(self, event):
+        if not self.on_plain_select(event):
+            return
         self.dragging_item = self.treeview.identify_row(event.y)
         if self.dragging_item:
+            self.drag_start_index = self.view_index(self.dragging_item)
             self.treeview.selection_set(self.dragging_item)
 
     def on_drag_motion(self, event):
@@ -528,82 +1782,167 @@ class ApplicationManager:
 
     def on_drag_end(self, event):
         if self.dragging_item:
-            moved_id = int(self.dragging_item)
-            new_index = self.treeview.index(self.dragging_item)
+            new_index = self.view_index(self.dragging_item)
 
-            self.original_order.remove(moved_id)
-            self.original_order.insert(new_index, moved_id)
-
-            self.save_data_to_file()
-            self.db_save_all()
+            if new_index != self.drag_start_index:
+                self.move_in_view(self.drag_start_index, new_index)
+                self.db_flush()
             self.dragging_item = None
 
     def on_key_move(self, direction):
-        selected = self.treeview.selection()
-        if not selected:
+        self.sync_selection()
+        positions = self.view_positions(self.selected)
+        if not positions or direction not in ("up", "down", "home", "end"):
             return
 
-        selected_item = selected[0]
-        current_index = self.treeview.index(selected_item)
-        items = self.treeview.get_children()
+        ids = {index: app_id for app_id, index in positions.items()}
+        indices = sorted(ids)
+        last = len(self.view_ids) - 1
+        count = len(indices)
+        if direction in ("up", "home"):
+            targets = [max(index - 1, k) if direction == "up" else k for k, index in enumerate(indices)]
+        else:
+            targets = [min(index + 1, last - (count - 1 - k)) if direction == "down" else last - (count - 1 - k)
+                       for k, index in enumerate(indices)]
+
+        # Runs of adjacent rows move as one block; a run already against the edge stays where it is
+        runs = []
+        for index in indices:
+            if runs and runs[-1][-1] == index - 1:
+                runs[-1].append(index)
+            else:
+                runs.append([index])
+        fixed = None
+        if direction in ("up", "home") and runs[0][0] == 0:
+            fixed = runs.pop(0)
+        elif direction in ("down", "end") and runs[-1][-1] == last:
+            fixed = runs.pop()
+        if not runs:
+            return
 
-        if direction == "up" and current_index > 0:
-            new_index = current_index - 1
-        elif direction == "down" and current_index < len(items) - 1:
-            new_index = current_index + 1
-        elif direction == "home":
-            new_index = 0
+        if direction == "home":
+            rows = [index for run in runs for index in run]
+            blocks = [(rows, fixed[-1], None) if fixed else (rows, None, 0)]
         elif direction == "end":
-            new_index = len(items) - 1
+            blocks = [([index for run in runs for index in run], (fixed[0] if fixed else last + 1) - 1, None)]
+        elif direction == "up":
+            blocks = []
+            previous = fixed
+            for run in runs:
+                if run[0] == 1:
+                    blocks.append((run, None, 0))
+                elif previous and previous[-1] == run[0] - 2:
+                    # The run above has already moved up past the row that separated the two
+                    blocks.append((run, previous[-1] if previous is fixed else previous[0] - 1, None))
+                else:
+                    blocks.append((run, run[0] - 2, None))
+                previous = run
         else:
-            return
+            blocks = [(run, run[-1] + 1, None) for run in reversed(runs)]
 
-        self.treeview.move(selected_item, "", new_index)
+        ids.update(self.view_at({index for rows, after, before in blocks for index in (after, before)
+                                 if index is not None}))
+        self.move_blocks([([ids[index] for index in rows],
+                           None if after is None else ids[after],
+                           None if before is None else ids[before]) for rows, after, before in blocks])
 
-        moved_id = int(selected_item)
-        self.original_order.remove(moved_id)
-        self.original_order.insert(new_index, moved_id)
+        if isinstance(self.view_ids, DatabaseView):
+            # The database answers the view, so it has to hold the new order before the window is read again
+            self.db_flush()
+        else:
+            view = self.view_ids
+            start, stop = min(indices[0], targets[0]), max(indices[-1], targets[-1]) + 1
+            placed = {target: ids[index] for index, target in zip(indices, targets)}
+            rest = iter([app_id for app_id in view[start:stop] if app_id not in self.selected])
+            view[start:stop] = [placed[index] if index in placed else next(rest) for index in range(start, stop)]
+
+        focus_row = -1 if direction in ("up", "home") else 0
+        focus_index = targets[focus_row]
+        if self.virtual_mode:
+            self.scroll_into_view(focus_index)
+        else:
+            self.render_view()
 
-        self.save_data_to_file()
-        self.db_save_all()
-        self.treeview.selection_set(selected_item)
-        self.treeview.focus(selected_item)
+        self.db_flush()
+        focus = str(ids[indices[focus_row]])
+        if focus in self.rendered:
+            self.treeview.focus(focus)
+            if not self.virtual_mode:
+                self.treeview.see(focus)
 
     def highlight_selected(self):
-        selected = self.treeview.selection()
+        selected = self.selected_ids()
         if not selected:
             messagebox.showinfo("Select Event", "Please select event to highlight")
             return
-        app_id = int(selected[0])
-        if app_id not in self.highlighted_items:
-            self.highlighted_items.add(app_id)
-            self.treeview.item(selected[0], tags=('highlight',))
-        self.refresh_display()
+        for app_id in selected:
+            if app_id not in self.highlighted_items:
+                self.highlighted_items.add(app_id)
+                self.update_row(app_id)
 
     def clear_highlight(self):
-        selected = self.treeview.selection()
+        selected = self.selected_ids()
         if not selected:
             messagebox.showinfo("Select Event", "Please select event to clear highlight")
             return
-        app_id = int(selected[0])
-        if app_id in self.highlighted_items:
-            self.highlighted_items.remove(app_id)
-            self.treeview.item(selected[0], tags=())
-        self.refresh_display()
+        for app_id in selected:
+            if app_id in self.highlighted_items:
+                self.highlighted_items.remove(app_id)
+                self.update_row(app_id)
 
     def add_application(self):
         self.application_dialog("Add New Application")
 
     def edit_application(self, event=None):
-        selected = self.treeview.selection()
+        selected = self.selected_ids()
         if not selected:
             messagebox.showinfo("Select Event", "Please select event to edit")
             return
+        if len(selected) > 1:
+            self.edit_seats()
+            return
 
-        item_id = int(selected[0])
-        old_values = self.treeview.item(selected[0], "values")
+        item_id = selected[0]
+        self.load_record(item_id)
+        old_values = self.applications[item_id]
         self.application_dialog("Edit Application", old_values, item_id)
 
+    def edit_seats(self):
+        selected = self.selected_ids()
+        if not selected:
+            messagebox.showinfo("Select Event", "Please select events to edit")
+            return
+
+        seats = simpledialog.askinteger("Set Seats", f"Seats for {len(selected)} selected applications:",
+                                        parent=self.root, minvalue=1, maxvalue=ApplicationStore.MAX_SEATS)
+        if seats is None:
+            return
+
+        changed = []
+        for app_id in selected:
+            self.load_record(app_id)
+            event, applicant, old_seats = self.applications[app_id]
+            if old_seats == seats:
+                continue
+            self.update_record(app_id, (event, applicant, seats))
+            self.mark_dirty(app_id)
+            self.journal("Edit", ["update", app_id, event, applicant, old_seats],
+                         ["update", app_id, event, applicant, seats])
+            changed.append((event, applicant, old_seats))
+
+        if not changed:
+            return
+
+        self.db_flush()
+        self.refresh_display()
+
+        if self.email_config["notify_on_edit"]:
+            subject = f"{len(changed)} Applications Updated"
+            body = (f"Seats were set to {seats} for {len(changed)} applications:\n" +
+                    "".join(f"{event} - {applicant} (was: {old_seats})\n" for event, applicant, old_seats in changed) +
+                    f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+            self.send_email(subject, body)
+
     def application_dialog(self, title, old_values=None, item_id=None):
         dialog = tk.Toplevel(self.root)
         dialog.title(title)
@@ -619,7 +1958,7 @@ class ApplicationManager:
             ("Seats number:", "seats", 2)
         ]
         def validate_seats(value):
-            return value.isdecimal() and int(value) > 0 or value == ""
+            return value.isdecimal() and 0 < int(value) <= ApplicationStore.MAX_SEATS or value == ""
 
         def show_invalid_seats():
             status_label.config(text="Please enter valid seats number!")
@@ -664,9 +2003,18 @@ class ApplicationManager:
             is_new = item_id is None
 
             if is_new:
-                self.applications[self.next_id] = (event, applicant, seats)
-                self.original_order.append(self.next_id)
-                self.next_id += 1
+                rank = None if self.fully_loaded else self.end_rank()
+                try:
+                    app_id = allocate_id(self.conn)
+                except sqlite3.OperationalError as e:
+                    if not is_busy(e):
+                        raise
+                    messagebox.showwarning("Database Busy", "Another station is writing to the database, "
+                                                            "press Save again in a moment.", parent=dialog)
+                    return
+                self.add_record(app_id, (event, applicant, seats), rank)
+                self.mark_dirty(app_id)
+                self.journal("Add", ["delete", app_id], ["insert", app_id, event, applicant, seats, None])
 
                 if self.email_config["notify_on_add"]:
                     subject = f"New Application: {event}"
@@ -679,7 +2027,10 @@ class ApplicationManager:
 
             else:
                 old_event, old_applicant, old_seats = self.applications[item_id]
-                self.applications[item_id] = (event, applicant, seats)
+                self.update_record(item_id, (event, applicant, seats))
+                self.mark_dirty(item_id)
+                self.journal("Edit", ["update", item_id, old_event, old_applicant, old_seats],
+                             ["update", item_id, event, applicant, seats])
 
                 if (self.email_config["notify_on_edit"]
                         and not (event == old_event
@@ -693,8 +2044,7 @@ class ApplicationManager:
                             f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
                     self.send_email(subject, body)
 
-            self.save_data_to_file()
-            self.db_save_all()
+            self.db_flush()
             self.refresh_display()
             self.update_statistics()
             dialog.destroy()
@@ -704,42 +2054,79 @@ class ApplicationManager:
         main_frame.columnconfigure(1, weight=1)
 
     def delete_application(self):
-        selected = self.treeview.selection()
+        selected = self.selected_ids()
         if not selected:
             messagebox.showinfo("Select Event", "Please select event to delete")
             return
 
-        item_id = int(selected[0])
+        self.load_records(selected)
+        if len(selected) > 1:
+            question = f"Delete {len(selected)} selected applications?"
+        else:
+            question = "Delete selected application?"
 
-        if messagebox.askyesno("Confirm", "Delete selected application?"):
+        if messagebox.askyesno("Confirm", question):
             if self.email_config["notify_on_delete"]:
-                event, applicant, seats = self.applications[item_id]
-                subject = "Application Deleted"
-                body = (f"Application has been deleted: {event}\n"
-                        f"Event: {event}\n"
-                        f"Applicant: {applicant})\n"
-                        f"Seats: {seats}\n"
-                        f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+                if len(selected) == 1:
+                    event, applicant, seats = self.applications[selected[0]]
+                    subject = "Application Deleted"
+                    body = (f"Application has been deleted: {event}\n"
+                            f"Event: {event}\n"
+                            f"Applicant: {applicant})\n"
+                            f"Seats: {seats}\n"
+                            f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+                else:
+                    subject = f"{len(selected)} Applications Deleted"
+                    body = (f"{len(selected)} applications have been deleted:\n" +
+                            "".join(f"{event} - {applicant} ({seats} seats)\n"
+                                    for event, applicant, seats in map(self.applications.get, selected)) +
+                            f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
                 self.send_email(subject, body)
 
-            if item_id in self.highlighted_items:
-                self.highlighted_items.remove(item_id)
-
-            del self.applications[item_id]
-            self.original_order.remove(item_id)
-            self.save_data_to_file()
-            self.db_save_all()
+            indexes = self.order_indexes(selected)
+            for removed, item_id in enumerate(sorted(selected, key=indexes.get)):
+                self.journal("Delete", ["insert", item_id, *self.applications[item_id], indexes[item_id] - removed],
+                             ["delete", item_id])
+                self.remove_record(item_id)
+                self.mark_deleted(item_id)
+            self.db_flush()
             self.refresh_display()
 
     def show_context_menu(self, event):
         item = self.treeview.identify_row(event.y)
         if item:
-            self.treeview.selection_set(item)
+            if item not in self.treeview.selection():
+                self.selected = set()
+                self.treeview.selection_set(item)
             self.context_menu.tk_popup(event.x_root, event.y_root)
 
     def on_closing(self):
-        self.save_data_to_file()
-        self.db_save_all()
+        if not self.db_flush(quiet=True) and not messagebox.askyesno(
+                "Database Busy",
+                "Another station is writing to the database and your latest changes are not saved yet. "
+                "Close anyway and discard them?"):
+            return
+        if self.flush_job is not None:
+            self.root.after_cancel(self.flush_job)
+        if self.load_job is not None:
+            self.root.after_cancel(self.load_job)
+        if self.sync_job is not None:
+            self.root.after_cancel(self.sync_job)
+        if self.snapshot_job is not None:
+            self.root.after_cancel(self.snapshot_job)
+            if self.snapshot_writer is not None:
+                self.snapshot_writer.thread.join()
+            try:
+                JsonSnapshot(self.db_file, self.data_file).work()
+            except (IOError, sqlite3.Error) as e:
+                messagebox.showerror("Error", f"Failed to save data: {str(e)}")
+        self.conn.close()
+        self.notifier.close()
+        if self.profile_file:
+            try:
+                self.profiler.dump(self.profile_file)
+            except IOError as e:
+                messagebox.showerror("Error", f"Failed to dump performance data: {str(e)}")
         self.root.destroy()
 
 
@@ -0,0 +1,232 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import OrderIndex, SearchCache, SortedColumnIndex
+
+
+class OrderIndexTest(unittest.TestCase):
+    def build(self, app_ids):
+        order = OrderIndex()
+        for app_id in app_ids:
+            order.append(app_id)
+        return order
+
+    def check(self, order, expected):
+        self.assertEqual(list(order), expected)
+        self.assertEqual(len(order), len(expected))
+        self.assertEqual(list(order.rank_column), sorted(order.rank_column))
+        for index, app_id in enumerate(expected):
+            self.assertEqual(order.index(app_id), index)
+            self.assertEqual(order.at(index), app_id)
+            self.assertEqual(order.rank(app_id), order.rank_column[index])
+
+    def test_append_keeps_gaps(self):
+        order = self.build([3, 1, 2])
+        self.check(order, [3, 1, 2])
+        self.assertEqual([order.rank(app_id) for app_id in (3, 1, 2)], [OrderIndex.GAP, 2 * OrderIndex.GAP,
+                                                                        3 * OrderIndex.GAP])
+
+    def test_append_with_lower_rank_is_inserted_in_order(self):
+        order = OrderIndex()
+        order.append(1, 300)
+        order.append(2, 100)
+        order.append(3, 200)
+        order.append(4, 200)
+        self.check(order, [2, 3, 4, 1])
+
+    def test_contains_and_remove(self):
+        order = self.build([1, 2, 3])
+        order.remove(2)
+        self.check(order, [1, 3])
+        self.assertNotIn(2, order)
+        self.assertNotIn(10, order)
+        with self.assertRaises(KeyError):
+            order.rank(2)
+
+    def test_move_takes_midpoint(self):
+        order = self.build([1, 2, 3, 4])
+        self.assertEqual(order.move(4, 1), {4: OrderIndex.GAP + OrderIndex.GAP // 2})
+        self.check(order, [1, 4, 2, 3])
+        self.assertEqual(order.move(4, 1), {})
+        self.assertEqual(order.move(2, 0), {2: 0})
+        self.check(order, [2, 1, 4, 3])
+        self.assertEqual(order.move(2, 3), {2: 4 * OrderIndex.GAP})
+        self.check(order, [1, 4, 3, 2])
+
+    def test_move_rebalances_when_ranks_run_out(self):
+        order = OrderIndex()
+        order.append(1, 10)
+        order.append(2, 11)
+        order.append(3, 12)
+        changed = order.move(3, 1)
+        self.check(order, [1, 3, 2])
+        self.assertEqual(changed, {1: OrderIndex.GAP, 3: 2 * OrderIndex.GAP, 2: 3 * OrderIndex.GAP})
+
+    def test_place_block(self):
+        order = self.build(range(1, 7))
+        for app_id in (2, 5):
+            order.remove(app_id)
+        changed = order.place([5, 2], 1)
+        self.check(order, [1, 5, 2, 3, 4, 6])
+        self.assertEqual(set(changed), {5, 2})
+        order.remove(1)
+        order.place([1], len(order))
+        self.check(order, [5, 2, 3, 4, 6, 1])
+
+    def test_place_block_rebalances_when_ranks_run_out(self):
+        order = OrderIndex()
+        order.append(1, 10)
+        order.append(2, 12)
+        changed = order.place([3, 4, 5], 1)
+        self.check(order, [1, 3, 4, 5, 2])
+        self.assertEqual(len(changed), 5)
+
+    def test_spread(self):
+        gap = OrderIndex.GAP
+        self.assertEqual(list(OrderIndex.spread(None, None, 2)), [gap, 2 * gap])
+        self.assertEqual(list(OrderIndex.spread(None, 0, 2)), [-2 * gap, -gap])
+        self.assertEqual(list(OrderIndex.spread(gap, None, 2)), [2 * gap, 3 * gap])
+        self.assertEqual(list(OrderIndex.spread(0, 9, 2)), [3, 6])
+        self.assertEqual(list(OrderIndex.spread(0, 3, 2)), [1, 2])
+        self.assertIsNone(OrderIndex.spread(0, 2, 2))
+
+    def test_scale(self):
+        order = self.build([2, 1])
+        order.scale(3)
+        self.check(order, [2, 1])
+        self.assertEqual(order.rank(1), 6 * OrderIndex.GAP)
+
+    def test_random_moves_match_list(self):
+        rng = random.Random(7)
+        expected = list(range(1, 201))
+        order = self.build(expected)
+        for _ in range(2000):
+            app_id = rng.choice(expected)
+            new_index = rng.randrange(len(expected))
+            expected.remove(app_id)
+            expected.insert(new_index, app_id)
+            order.move(app_id, new_index)
+        self.check(order, expected)
+
+
+class SearchCacheTest(unittest.TestCase):
+    EVENTS = ["Kyiv Marathon", "Lviv Coffee Fest", "Odesa Jazz", "Book Arsenal", "Atlas Weekend"]
+    NAMES = ["Olena Shevchenko", "Taras Bondarenko", "Iryna Kovalenko", "Andriy Melnyk", "Oksana Tkachenko"]
+    QUERIES = ["", "a", "ko", "shev", "shevchenko", "jazz", "fest", "o", "lviv coffee", "enko", "zz", "missing", "ß"]
+
+    def naive(self, rows, query):
+        query = query.lower()
+        return {app_id for app_id, app in rows.items() if query in app[0].lower() or query in app[1].lower()}
+
+    def check(self, cache, rows):
+        for query in self.QUERIES:
+            matches = cache.search(query)
+            if not query:
+                self.assertIsNone(matches)
+            else:
+                self.assertEqual(set(matches), self.naive(rows, query), query)
+
+    def test_matches_naive_search(self):
+        rng = random.Random(3)
+        rows = {}
+        cache = SearchCache()
+        for app_id in range(1, 301):
+            rows[app_id] = (rng.choice(self.EVENTS), rng.choice(self.NAMES), rng.randint(1, 9))
+            cache.add(app_id, rows[app_id])
+        self.check(cache, rows)
+
+    def test_follows_adds_updates_and_removes(self):
+        rng = random.Random(5)
+        rows = {}
+        cache = SearchCache()
+        for app_id in range(1, 101):
+            rows[app_id] = (rng.choice(self.EVENTS), rng.choice(self.NAMES), 1)
+            cache.add(app_id, rows[app_id])
+        cache.search("shev")
+        for _ in range(300):
+            app_id = rng.randint(1, 120)
+            if app_id in rows:
+                cache.remove(app_id, rows.pop(app_id))
+                if rng.random() < 0.5:
+                    rows[app_id] = (rng.choice(self.EVENTS), rng.choice(self.NAMES), 2)
+                    cache.add(app_id, rows[app_id])
+            else:
+                rows[app_id] = (rng.choice(self.EVENTS), rng.choice(self.NAMES), 3)
+                cache.add(app_id, rows[app_id])
+            # The cached result for the current query has to follow every change
+            self.assertEqual(set(cache.search("shev")), self.naive(rows, "shev"))
+        self.check(cache, rows)
+
+    def test_narrowing_query_reuses_matches(self):
+        cache = SearchCache()
+        rows = {app_id: ("Event", "Other", 1) for app_id in range(1, 101)}
+        rows[7] = ("Event", "Olena Shevchenko", 1)
+        rows[8] = ("Shevchenko Readings", "Other", 1)
+        for app_id, app in rows.items():
+            cache.add(app_id, app)
+        for query in ["s", "sh", "she", "shevchenko", "shevchenko r"]:
+            self.assertEqual(set(cache.search(query)), self.naive(rows, query), query)
+
+    def test_clear(self):
+        cache = SearchCache()
+        cache.add(1, ("Odesa Jazz", "Olena", 1))
+        cache.search("jazz")
+        cache.clear()
+        self.assertEqual(set(cache.search("jazz")), set())
+        cache.add(2, ("Jazz Koktebel", "Taras", 1))
+        self.assertEqual(set(cache.search("jazz")), {2})
+
+
+class SortedColumnIndexTest(unittest.TestCase):
+    def test_text_and_number_columns_match_sorted(self):
+        rng = random.Random(11)
+        rows = {app_id: (rng.choice("abcde") * rng.randint(1, 3), rng.choice("xyz"), rng.randint(1, 9))
+                for app_id in range(1, 201)}
+        for column in range(3):
+            index = SortedColumnIndex(column)
+            for app_id, app in rows.items():
+                index.add(app_id, app)
+            expected = sorted(rows, key=lambda app_id: (rows[app_id][column], app_id))
+            self.assertEqual(list(index.ids()), expected)
+            self.assertEqual(list(index.ids(reverse=True)), expected[::-1])
+
+    def test_adds_and_removes_after_sorting(self):
+        rng = random.Random(13)
+        rows = {}
+        index = SortedColumnIndex(2)
+        for app_id in range(1, 51):
+            rows[app_id] = ("Event", "Name", rng.randint(1, 9))
+            index.add(app_id, rows[app_id])
+        index.ensure_sorted()
+        for _ in range(300):
+            app_id = rng.randint(1, 80)
+            if app_id in rows:
+                index.remove(app_id, rows.pop(app_id))
+            else:
+                rows[app_id] = ("Event", "Name", rng.randint(1, 9))
+                index.add(app_id, rows[app_id])
+            self.assertTrue(index.is_sorted)
+        self.assertEqual(list(index.ids()), sorted(rows, key=lambda app_id: (rows[app_id][2], app_id)))
+
+    def test_ids_beyond_the_codes_grow_them(self):
+        index = SortedColumnIndex(1)
+        index.add(1000, ("Event", "b", 1))
+        index.add(3, ("Event", "a", 1))
+        self.assertEqual(list(index.ids()), [3, 1000])
+        self.assertEqual(index.value(1000), "b")
+
+    def test_clear(self):
+        index = SortedColumnIndex(0)
+        index.add(1, ("b", "", 0))
+        index.ensure_sorted()
+        index.clear()
+        index.add(2, ("a", "", 0))
+        self.assertEqual(list(index.ids()), [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmarks
+import main
+from engine import UNDO_SWAP, CsvImporter, changed_elsewhere, init_database, last_change, log_changes
+
+
+class ChangeLogTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        init_database(self.conn, station="station")
+
+    def test_only_other_writers_count(self):
+        since = last_change(self.conn)
+        self.assertFalse(changed_elsewhere(self.conn, since, "a"))
+        log_changes(self.conn, [1, 2], "a")
+        self.assertFalse(changed_elsewhere(self.conn, since, "a"))
+        self.assertTrue(changed_elsewhere(self.conn, since, "b"))
+        since = log_changes(self.conn, [3], "b")
+        self.assertFalse(changed_elsewhere(self.conn, since, "a"))
+
+    def test_unknown_or_trimmed_history_counts_as_changed(self):
+        self.assertTrue(changed_elsewhere(self.conn, None, "a"))
+        since = log_changes(self.conn, [1], "a")
+        with mock.patch("engine.CHANGE_LOG_LIMIT", 2):
+            for app_id in range(2, 6):
+                log_changes(self.conn, [app_id], "a")
+        # Entries after since were trimmed away, so another writer may have been among them
+        self.assertTrue(changed_elsewhere(self.conn, since, "a"))
+
+
+class JournalConflictTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(directory.name)
+        environ = mock.patch.dict(os.environ, LAZY_LOAD="0", JSON_SNAPSHOT="0", SQL_VIEW="0",
+                                  SMTP_EMAIL="test@localhost", SMTP_PASSWORD="test", SMTP_DESTINATION_EMAIL="")
+        environ.start()
+        self.addCleanup(environ.stop)
+        self.warnings = []
+        self.infos = []
+        for name, calls in (("showwarning", self.warnings), ("showinfo", self.infos)):
+            patcher = mock.patch.object(main.messagebox, name, side_effect=lambda *args, calls=calls, **kwargs:
+                                        calls.append(args))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.applications = benchmarks.generate_applications(50)
+        benchmarks.create_database("applications.sqlite", self.applications)
+
+    def open(self, key_file):
+        with mock.patch.dict(os.environ, STATION_KEY_FILE=key_file):
+            manager = benchmarks.headless_manager()
+        self.addCleanup(manager.on_closing)
+        return manager
+
+    def seats(self, app_id):
+        with sqlite3.connect("applications.sqlite") as conn:
+            return conn.execute("SELECT seats FROM applications WHERE id = ?", (app_id,)).fetchone()[0]
+
+    def count(self):
+        with sqlite3.connect("applications.sqlite") as conn:
+            return conn.execute("SELECT COUNT(*) FROM applications").fetchone()[0]
+
+    def edit(self, manager, app_id, seats, journal=True):
+        manager.poll_changes()
+        event, applicant, old = manager.applications[app_id]
+        if journal:
+            manager.journal("Edit", ["update", app_id, event, applicant, old],
+                            ["update", app_id, event, applicant, seats])
+        manager.update_record(app_id, (event, applicant, seats))
+        manager.mark_dirty(app_id)
+        return manager.db_flush()
+
+    def import_csv(self, manager):
+        benchmarks.write_csv("more.csv", benchmarks.generate_applications(10, seed=7))
+        job = CsvImporter("applications.sqlite", "more.csv", station=manager.station, writer=manager.writer)
+        job.run()
+        while True:
+            event = job.events.get()
+            if event[0] != "progress":
+                break
+        self.assertEqual(event[0], "done", event)
+        manager.poll_changes()
+
+    def test_stations_undo_their_own_edits(self):
+        a, b = self.open("a.key"), self.open("b.key")
+        self.assertNotEqual(a.station, b.station)
+        seats_1, seats_2 = self.seats(1), self.seats(2)
+        self.edit(a, 1, 101)
+        self.edit(b, 2, 102)
+
+        a.poll_changes()
+        a.undo()
+        self.assertEqual((self.seats(1), self.seats(2)), (seats_1, 102))
+        b.poll_changes()
+        b.undo()
+        self.assertEqual(self.seats(2), seats_2)
+        a.poll_changes()
+        a.redo()
+        self.assertEqual(self.seats(1), 101)
+        self.assertEqual(self.warnings, [])
+
+    def test_undo_leaves_rows_changed_elsewhere(self):
+        a, b = self.open("a.key"), self.open("b.key")
+        self.edit(a, 1, 101)
+        self.edit(a, 2, 102)
+        self.edit(b, 2, 202)
+
+        a.poll_changes()
+        a.undo()
+        self.assertEqual(self.seats(2), 202)
+        self.assertEqual(a.applications[2][2], 202)
+        self.assertEqual(len(self.warnings), 1)
+        self.assertIn("changed at another station", self.warnings[0][1])
+        # Older entries whose rows are untouched elsewhere still undo
+        a.undo()
+        self.assertEqual(self.seats(1), self.applications[1][2])
+
+    def test_stale_edit_is_discarded_on_flush(self):
+        a, b = self.open("a.key"), self.open("b.key")
+        self.edit(b, 3, 203)
+        # A has not seen B's edit yet, so its write carries an old version
+        event, applicant, _ = a.applications[3]
+        a.update_record(3, (event, applicant, 103))
+        a.mark_dirty(3)
+        self.assertTrue(a.db_flush())
+
+        self.assertEqual(self.seats(3), 203)
+        self.assertEqual(a.applications[3][2], 203)
+        self.assertEqual(len(self.warnings), 1)
+        self.assertIn("Your changes to them were discarded", self.warnings[0][1])
+
+    def test_import_undo_is_refused_after_another_writer(self):
+        a, b = self.open("a.key"), self.open("b.key")
+        self.import_csv(a)
+        self.assertEqual(self.count(), 10)
+        self.edit(b, 1, 201)
+
+        a.poll_changes()
+        a.undo()
+        self.assertEqual(self.count(), 10)
+        self.assertIn("can no longer be undone", self.warnings[-1][1])
+        self.assertEqual(a.conn.execute("SELECT COUNT(*) FROM journal WHERE undo = ?", (UNDO_SWAP,)).fetchone()[0], 0)
+
+    def test_import_undo_after_own_edits(self):
+        a = self.open("a.key")
+        self.import_csv(a)
+        self.edit(a, 1, 301)
+
+        a.undo()
+        a.undo()
+        self.assertEqual(self.count(), 50)
+        self.assertEqual(self.warnings, [])
+        a.redo()
+        self.assertEqual(self.count(), 10)
+
+    def test_shared_station_key_keeps_writers_apart(self):
+        a = self.open("a.key")
+        a2 = self.open("a.key")
+        self.assertEqual(a.station, a2.station)
+        self.assertNotEqual(a.writer, a2.writer)
+        self.import_csv(a)
+        # Unjournaled so the shared history only holds the import
+        a2.poll_changes()
+        self.edit(a2, 1, 401, journal=False)
+
+        a.poll_changes()
+        a.undo()
+        self.assertEqual(self.count(), 10)
+        self.assertIn("can no longer be undone", self.warnings[-1][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import contextlib
+import email
+import email.policy
+import io
+import os
+import socket
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import EmailNotifier
+
+
+class SmtpStub:
+    # Just enough of an SMTP server for smtplib: no TLS, no auth, messages are kept in memory
+    def __init__(self, drop_after=None):
+        self.drop_after = drop_after
+        self.messages = []
+        self.connections = 0
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn):
+        with conn, conn.makefile("rb") as lines:
+            conn.sendall(b"220 localhost SMTP stub\r\n")
+            received = 0
+            for line in lines:
+                command = line[:4].upper()
+                if command == b"EHLO":
+                    conn.sendall(b"250-localhost\r\n250 8BITMIME\r\n")
+                elif command == b"DATA":
+                    conn.sendall(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    data = []
+                    for line in lines:
+                        if line == b".\r\n":
+                            break
+                        data.append((line[1:] if line.startswith(b"..") else line).replace(b"\r\n", b"\n"))
+                    self.messages.append(email.message_from_bytes(b"".join(data), policy=email.policy.default))
+                    conn.sendall(b"250 OK\r\n")
+                    received += 1
+                    if self.drop_after is not None and received >= self.drop_after:
+                        # Like a server timing out an idle client: the next command finds the socket closed
+                        return
+                elif command == b"QUIT":
+                    conn.sendall(b"221 Bye\r\n")
+                    return
+                elif command in (b"HELO", b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                    conn.sendall(b"250 OK\r\n")
+                else:
+                    conn.sendall(b"502 Command not implemented\r\n")
+
+    def close(self):
+        self.listener.close()
+
+
+class EmailNotifierTest(unittest.TestCase):
+    def setUp(self):
+        self.server = SmtpStub()
+        self.notifier = None
+
+    def tearDown(self):
+        if self.notifier is not None:
+            self.notifier.close()
+        self.server.close()
+
+    def start(self, port=None, **kwargs):
+        config = {
+            "smtp_server": "127.0.0.1",
+            "smtp_port": port or self.server.port,
+            "use_tls": False,
+            "sender_email": "sender@localhost",
+            "sender_password": "",
+        }
+        kwargs.setdefault("batch_delay", 0.2)
+        kwargs.setdefault("retry_delay", 0.01)
+        self.notifier = EmailNotifier(config, **kwargs)
+        return self.notifier
+
+    def subjects(self):
+        return [(message["To"], message["Subject"]) for message in self.server.messages]
+
+    def test_small_batch_is_sent_one_by_one_over_one_connection(self):
+        notifier = self.start(digest_threshold=5)
+        for number in range(3):
+            notifier.notify("admin@localhost", f"Added {number}", f"Application {number}")
+        notifier.close()
+
+        self.assertEqual(self.subjects(), [("admin@localhost", f"Added {number}") for number in range(3)])
+        self.assertEqual(self.server.messages[0]["From"], "sender@localhost")
+        self.assertEqual(self.server.messages[2].get_content().strip(), "Application 2")
+        self.assertEqual(self.server.connections, 1)
+
+    def test_later_batches_reuse_the_connection(self):
+        notifier = self.start(batch_delay=0.05)
+        notifier.notify("admin@localhost", "First", "one")
+        time.sleep(0.3)
+        notifier.notify("admin@localhost", "Second", "two")
+        notifier.close()
+
+        self.assertEqual(self.subjects(), [("admin@localhost", "First"), ("admin@localhost", "Second")])
+        self.assertEqual(self.server.connections, 1)
+
+    def test_digest_at_threshold(self):
+        notifier = self.start(digest_threshold=5)
+        for number in range(6):
+            notifier.notify("admin@localhost", f"Deleted {number}", f"Application {number}")
+        notifier.notify("other@localhost", "Edited", "Application 9")
+        notifier.close()
+
+        self.assertEqual(self.subjects(), [("admin@localhost", "Applications Digest: 6 notifications"),
+                                           ("other@localhost", "Edited")])
+        body = self.server.messages[0].get_content()
+        for number in range(6):
+            self.assertIn(f"Deleted {number}\nApplication {number}", body)
+
+    def test_below_threshold_per_receiver(self):
+        notifier = self.start(digest_threshold=3)
+        for number in range(4):
+            notifier.notify(f"user{number % 2}@localhost", f"Added {number}", "body")
+        notifier.close()
+
+        self.assertEqual(sorted(self.subjects()), [("user0@localhost", "Added 0"), ("user0@localhost", "Added 2"),
+                                                   ("user1@localhost", "Added 1"), ("user1@localhost", "Added 3")])
+
+    def test_reconnects_after_server_drops_connection(self):
+        self.server.drop_after = 1
+        notifier = self.start(digest_threshold=5)
+        for number in range(3):
+            notifier.notify("admin@localhost", f"Added {number}", "body")
+        notifier.close()
+
+        self.assertEqual(self.subjects(), [("admin@localhost", f"Added {number}") for number in range(3)])
+        self.assertEqual(self.server.connections, 3)
+
+    def test_gives_up_after_max_retries(self):
+        self.server.close()
+        notifier = self.start(port=self.server.port, max_retries=3)
+        output = io.StringIO()
+        started = time.monotonic()
+        with contextlib.redirect_stdout(output):
+            sent = notifier.send_with_retry(notifier.build_message("admin@localhost", "Lost", "body"))
+
+        self.assertFalse(sent)
+        self.assertIn("Failed to send email", output.getvalue())
+        # Backs off 0.01 then 0.02 seconds between the three attempts
+        self.assertGreaterEqual(time.monotonic() - started, 0.03)
+        self.assertIsNone(notifier.server)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,99 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import json
 import os
+import bisect
+
+
+class OrderIndex:
+    GAP = 1 << 16
+
+    def __init__(self):
+        self.ranks = {}
+        self.entries = []
+
+    def __iter__(self):
+        return (app_id for rank, app_id in self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, app_id):
+        return app_id in self.ranks
+
+    def rank(self, app_id):
+        return self.ranks[app_id]
+
+    def index(self, app_id):
+        return bisect.bisect_left(self.entries, (self.ranks[app_id], app_id))
+
+    def at(self, index):
+        return self.entries[index][1]
+
+    def append(self, app_id, rank=None):
+        if rank is None:
+            rank = self.entries[-1][0] + self.GAP if self.entries else self.GAP
+        if self.entries and rank <= self.entries[-1][0]:
+            bisect.insort(self.entries, (rank, app_id))
+        else:
+            self.entries.append((rank, app_id))
+        self.ranks[app_id] = rank
+        return rank
+
+    def remove(self, app_id):
+        del self.entries[self.index(app_id)]
+        del self.ranks[app_id]
+
+    def move(self, app_id, new_index):
+        old_index = self.index(app_id)
+        if old_index == new_index:
+            return {}
+        del self.entries[old_index]
+
+        before = self.entries[new_index - 1][0] if new_index > 0 else None
+        after = self.entries[new_index][0] if new_index < len(self.entries) else None
+        if before is None and after is None:
+            rank = self.GAP
+        elif before is None:
+            rank = after - self.GAP
+        elif after is None:
+            rank = before + self.GAP
+        elif after - before > 1:
+            rank = (before + after) // 2
+        else:
+            self.entries.insert(new_index, (before, app_id))
+            return self.rebalance()
+
+        self.entries.insert(new_index, (rank, app_id))
+        self.ranks[app_id] = rank
+        return {app_id: rank}
+
+    def rebalance(self):
+        self.entries = [((index + 1) * self.GAP, app_id) for index, (rank, app_id) in enumerate(self.entries)]
+        self.ranks = {app_id: rank for rank, app_id in self.entries}
+        return dict(self.ranks)
+
+
+def longest_increasing_run(items, positions):
+    tails = []
+    tail_items = []
+    parents = {}
+    for item in items:
+        position = positions[item]
+        slot = bisect.bisect_left(tails, position)
+        parents[item] = tail_items[slot - 1] if slot else None
+        if slot == len(tails):
+            tails.append(position)
+            tail_items.append(item)
+        else:
+            tails[slot] = position
+            tail_items[slot] = item
+
+    result = set()
+    item = tail_items[-1] if tail_items else None
+    while item is not None:
+        result.add(item)
+        item = parents[item]
+    return result
 
 
 class ApplicationManager:
@@ -10,10 +103,11 @@ class ApplicationManager:
         self.root.title("Application Management System")
         self.data_file = "applications.json"
 
-        self.original_order = []
+        self.original_order = OrderIndex()
         self.applications = {}
         self.next_id = 1
         self.highlighted_items = set()
+        self.rendered = {}
 
         self.current_filter = "All"
         self.current_search = ""
@@ -148,8 +242,6 @@ class ApplicationManager:
             messagebox.showerror("Error", f"Failed to save data: {str(e)}")
 
     def refresh_display(self):
-        self.treeview.delete(*self.treeview.get_children())
-
         filtered_data = []
         for app_id in self.original_order:
             if app_id in self.applications:
@@ -173,12 +265,52 @@ class ApplicationManager:
             col_index = ["event", "applicant", "seats"].index(self.sort_column)
             filtered_data.sort(key=lambda x: x[1][col_index], reverse=self.sort_reverse)
 
-        for app_id, app_data in filtered_data:
-            tags = ['highlight'] if app_id in self.highlighted_items else []
-            self.treeview.insert("", "end", values=app_data, tags=tags, iid=str(app_id))
-
+        self.render_rows([app_id for app_id, app_data in filtered_data])
         self.update_column_headers()
 
+    def render_rows(self, app_ids):
+        wanted = [str(app_id) for app_id in app_ids]
+        wanted_set = set(wanted)
+
+        current = self.treeview.get_children()
+        stale = [item for item in current if item not in wanted_set]
+        if stale:
+            self.treeview.delete(*stale)
+            for item in stale:
+                self.rendered.pop(item, None)
+
+        positions = {item: index for index, item in enumerate(wanted)}
+        in_place = longest_increasing_run([item for item in current if item in wanted_set], positions)
+
+        previous = None
+        for app_id, item in zip(app_ids, wanted):
+            row = self.row_state(app_id)
+            if item not in self.rendered:
+                index = self.treeview.index(previous) + 1 if previous else 0
+                self.treeview.insert("", index, iid=item, values=row[0], tags=row[1])
+            else:
+                if item not in in_place:
+                    index = self.treeview.index(previous) + 1 if previous else 0
+                    if previous and self.treeview.index(item) < index:
+                        index -= 1
+                    self.treeview.move(item, "", index)
+                if self.rendered[item] != row:
+                    self.treeview.item(item, values=row[0], tags=row[1])
+            self.rendered[item] = row
+            previous = item
+
+    def row_state(self, app_id):
+        tags = ('highlight',) if app_id in self.highlighted_items else ()
+        return self.applications[app_id], tags
+
+    def update_row(self, app_id):
+        item = str(app_id)
+        if item in self.rendered:
+            row = self.row_state(app_id)
+            if self.rendered[item] != row:
+                self.treeview.item(item, values=row[0], tags=row[1])
+                self.rendered[item] = row
+
     def apply_filters(self, event=None):
         self.current_search = self.search_var.get().lower()
         self.current_filter = self.filter_var.get()
@@ -227,8 +359,7 @@ class ApplicationManager:
             moved_id = int(self.dragging_item)
             new_index = self.treeview.index(self.dragging_item)
 
-            self.original_order.remove(moved_id)
-            self.original_order.insert(new_index, moved_id)
+            self.original_order.move(moved_id, new_index)
 
             self.save_data_to_file()
             self.dragging_item = None
@@ -256,8 +387,7 @@ class ApplicationManager:
         self.treeview.move(selected_item, "", new_index)
 
         moved_id = int(selected_item)
-        self.original_order.remove(moved_id)
-        self.original_order.insert(new_index, moved_id)
+        self.original_order.move(moved_id, new_index)
 
         self.save_data_to_file()
         self.treeview.selection_set(selected_item)
@@ -271,8 +401,7 @@ class ApplicationManager:
         app_id = int(selected[0])
         if app_id not in self.highlighted_items:
             self.highlighted_items.add(app_id)
-            self.treeview.item(selected[0], tags=('highlight',))
-        self.refresh_display()
+            self.update_row(app_id)
 
     def clear_highlight(self):
         selected = self.treeview.selection()
@@ -282,8 +411,7 @@ class ApplicationManager:
         app_id = int(selected[0])
         if app_id in self.highlighted_items:
             self.highlighted_items.remove(app_id)
-            self.treeview.item(selected[0], tags=())
-        self.refresh_display()
+            self.update_row(app_id)
 
     def add_application(self):
         self.application_dialog("Add New Application")